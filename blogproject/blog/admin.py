@@ -14,8 +14,9 @@ class CategoryAdmin(admin.ModelAdmin):
 class PostAdmin(admin.ModelAdmin):
     """Регистрация в админ-панели :model:`blog.Post`."""
 
-    list_display = ["title", "author", "slug", "category"]
+    list_display = ["title", "author", "slug", "category", "likes_amount", "comments_amount"]
     list_display_links = ("title", "slug")
+    readonly_fields = ("likes_amount", "comments_amount")
 
 
 @admin.register(Comment)
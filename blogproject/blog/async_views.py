@@ -0,0 +1,118 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import redirect
+
+from utils.concurrency import aget_user, in_own_connection
+from utils.pagination import EstimatedCountPaginator
+
+from . import views
+from .cache import awarm_sidebar
+from .mixins import AsyncLoginRequiredMixin, CursorPaginationMixin
+from .models import Comment, Post
+
+
+class AsyncListMixin:
+    """
+    Async-вариант представления списка.
+
+    Страница выбирается async-методами ORM параллельно с корутинами
+    из :meth:`get_concurrent_queries`, а контекст собирается
+    кодом исходного представления в потоке.
+    """
+
+    paginator_class = EstimatedCountPaginator
+    object_count = None
+    _async_page = None
+
+    def get_concurrent_queries(self):
+        """Корутины, выполняемые параллельно с выборкой страницы."""
+        return [awarm_sidebar()]
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Колличество записей уже получено через `acount()`."""
+        if self.object_count is not None:
+            kwargs.setdefault("count", self.object_count)
+        return super().get_paginator(queryset, per_page, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        """Вернуть страницу, выбранную в :meth:`apaginate`."""
+        if self._async_page is not None:
+            return self._async_page
+        return super().paginate_queryset(queryset, page_size)
+
+    async def apaginate(self, queryset, page_size):
+        """Выбрать страницу списка async-методами ORM."""
+        if isinstance(self, CursorPaginationMixin):
+            return await self.apaginate_queryset(queryset, page_size)
+        self.object_count = await queryset.acount()
+        paginator, page, object_list, is_paginated = self.paginate_queryset(queryset, page_size)
+        page.object_list = [obj async for obj in object_list]
+        return paginator, page, page.object_list, is_paginated
+
+    async def get(self, request, *args, **kwargs):
+        await aget_user(request)
+        self.object_list = await sync_to_async(self.get_queryset)()
+        self._async_page, *_ = await asyncio.gather(
+            self.apaginate(self.object_list, self.get_paginate_by(self.object_list)), *self.get_concurrent_queries()
+        )
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+
+class PostListView(AsyncListMixin, views.PostListView):
+    """Асинхронный вариант :view:`blog.views.PostListView`."""
+
+
+class TrendingPostListView(AsyncListMixin, views.TrendingPostListView):
+    """Асинхронный вариант :view:`blog.views.TrendingPostListView`."""
+
+
+class CategoryListView(AsyncListMixin, views.CategoryListView):
+    """Асинхронный вариант :view:`blog.views.CategoryListView`."""
+
+
+class PostSearchView(AsyncLoginRequiredMixin, AsyncListMixin, views.PostSearchView):
+    """Асинхронный вариант :view:`blog.views.PostSearchView`."""
+
+
+class PostDetailView(views.PostDetailView):
+    """
+    Асинхронный вариант :view:`blog.views.PostDetailView`.
+
+    Пост и первая порция комментариев выбираются параллельно.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        await aget_user(request)
+        slug = self.kwargs["slug"]
+        comments = self.get_comments_paginator(Comment.objects.filter(post__slug=slug))
+        try:
+            self.object, self.comments_page = await asyncio.gather(
+                self.get_queryset().aget(), in_own_connection(comments.page)()
+            )
+        except Post.DoesNotExist:
+            raise Http404("Пост не найден.")
+        context = await sync_to_async(self.get_context_data)(object=self.object)
+        return self.render_to_response(context)
+
+    def get_comments_page(self):
+        """Первая порция комментариев, выбранная в :meth:`get`."""
+        return self.comments_page
+
+
+class LikeCreateView(AsyncLoginRequiredMixin, views.LikeCreateView):
+    """
+    Асинхронный вариант :view:`blog.views.LikeCreateView`.
+
+    Переключение like выполняется в транзакции, поэтому в потоке.
+    """
+
+    async def post(self, request):
+        try:
+            post = await Post.objects.aget(slug=request.POST.get("post_slug"))
+        except Post.DoesNotExist:
+            raise Http404("Пост не найден.")
+        await sync_to_async(post.toggle_like)(request.user)
+        return redirect(post, permanent=True)
@@ -0,0 +1,95 @@
+"""
+Подсказки поиска по мере ввода: заголовки постов и названия категорий,
+похожие на введённый текст с учётом опечаток (расширение ``pg_trgm``).
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.db import OperationalError, connections, router, transaction
+from django.urls import reverse
+
+from .models import Category, Post
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_PREFIX = "blog:autocomplete"
+
+# Более длинный ввод обрезается: подсказки нужны для начала запроса.
+MAX_PREFIX_LENGTH = 50
+
+
+def normalize_prefix(text):
+    """Введённый текст без регистра и лишних пробелов: так подсказки чаще берутся из кеша."""
+    return " ".join(text.lower().split())[:MAX_PREFIX_LENGTH]
+
+
+def _cache_key(prefix, limit):
+    return f"{AUTOCOMPLETE_PREFIX}:{limit}:{hashlib.md5(prefix.encode()).hexdigest()}"
+
+
+def similar_by_words(queryset, field_name, prefix, limit):
+    """Записи, в поле `field_name` которых есть слово, похожее на `prefix`, от самых похожих."""
+    return (
+        queryset.filter(**{f"{field_name}__trigram_word_similar": prefix})
+        .annotate(similarity=TrigramWordSimilarity(prefix, field_name))
+        .order_by("-similarity", "-pk")[:limit]
+    )
+
+
+def find_suggestions(prefix, limit):
+    """
+    Выбирает подсказки из базы данных.
+
+    Оба запроса выполняются в одной транзакции с ``statement_timeout``,
+    поэтому подсказки не могут занять соединение дольше ``AUTOCOMPLETE_TIMEOUT_MS``.
+
+    Returns:
+        Словарь со списками ``posts`` и ``categories`` или None, если время вышло.
+    """
+    using = router.db_for_read(Post)
+    try:
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute("SELECT set_config('statement_timeout', %s, true)", [str(settings.AUTOCOMPLETE_TIMEOUT_MS)])
+            posts = similar_by_words(Post.objects.using(using), "title", prefix, limit).values_list("title", "slug")
+            categories = similar_by_words(Category.objects.using(using), "name", prefix, limit).values_list(
+                "name", "pk", "slug"
+            )
+            return {
+                "posts": [
+                    {"title": title, "url": reverse("blog:post_detail", kwargs={"slug": slug})}
+                    for title, slug in posts
+                ],
+                "categories": [
+                    {"title": name, "url": reverse("blog:category_detail", args=[pk, slug])}
+                    for name, pk, slug in categories
+                ],
+            }
+    except OperationalError:
+        logger.warning("Подсказки для «%s» не уложились в %s мс", prefix, settings.AUTOCOMPLETE_TIMEOUT_MS)
+        return None
+
+
+def get_suggestions(text, limit=None):
+    """
+    Подсказки для введённого текста `text` из кеша.
+
+    Короткий срок хранения заменяет сброс кеша: новые посты
+    появляются в подсказках не позже чем через ``AUTOCOMPLETE_CACHE_TIMEOUT``.
+    Результат, не уложившийся во время, не кешируется.
+    """
+    limit = limit or settings.AUTOCOMPLETE_LIMIT
+    prefix = normalize_prefix(text)
+    if len(prefix) < settings.AUTOCOMPLETE_MIN_LENGTH:
+        return {"posts": [], "categories": []}
+    key = _cache_key(prefix, limit)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = find_suggestions(prefix, limit)
+        if suggestions is None:
+            return {"posts": [], "categories": []}
+        cache.set(key, suggestions, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return suggestions
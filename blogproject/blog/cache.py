@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from utils.concurrency import in_own_connection
+
+from .models import Comment, PageTag, Post
+
+TOTAL_POSTS_KEY = "blog:sidebar:total_posts"
+LATEST_COMMENTS_KEY = "blog:sidebar:latest_comments"
+TRENDING_POSTS_KEY = "blog:sidebar:trending_posts"
+
+# Сколько последних комментариев хранится в кеше боковой панели.
+LATEST_COMMENTS_LIMIT = 10
+
+# Сколько популярных постов хранится в кеше боковой панели.
+TRENDING_POSTS_LIMIT = 10
+
+PAGE_CACHE_PREFIX = "blog:page"
+
+AUTHOR_STATS_PREFIX = "blog:author_stats"
+
+
+def get_total_posts():
+    """Колличество всех :model:`blog.Post` из кеша."""
+    return cache.get_or_set(TOTAL_POSTS_KEY, Post.objects.count, settings.SIDEBAR_CACHE_TIMEOUT)
+
+
+def _latest_comments():
+    return list(Comment.objects.order_by("-pub_date", "-id").select_related("author")[:LATEST_COMMENTS_LIMIT])
+
+
+def get_latest_comments(count):
+    """Последние `count` :model:`blog.Comment` из кеша."""
+    if count > LATEST_COMMENTS_LIMIT:
+        return list(Comment.objects.order_by("-pub_date", "-id").select_related("author")[:count])
+    return cache.get_or_set(LATEST_COMMENTS_KEY, _latest_comments, settings.SIDEBAR_CACHE_TIMEOUT)[:count]
+
+
+def _trending_posts(count=TRENDING_POSTS_LIMIT):
+    return list(Post.objects.order_by("-trending_score", "-id").only("pk", "title", "slug")[:count])
+
+
+def get_trending_posts(count):
+    """Самые популярные `count` :model:`blog.Post` из кеша."""
+    if count > TRENDING_POSTS_LIMIT:
+        return _trending_posts(count)
+    return cache.get_or_set(TRENDING_POSTS_KEY, _trending_posts, settings.SIDEBAR_CACHE_TIMEOUT)[:count]
+
+
+def _author_stats_key(author_id):
+    return f"{AUTHOR_STATS_PREFIX}:{author_id}"
+
+
+def get_author_stats(author_id):
+    """
+    Колличество :model:`blog.Post` автора, likes и комментариев к ним из кеша.
+
+    Returns:
+        Словарь с ключами ``posts``, ``likes`` и ``comments``.
+    """
+
+    def load():
+        return Post.objects.filter(author_id=author_id).aggregate(
+            posts=Count("id"),
+            likes=Coalesce(Sum("likes_amount"), 0),
+            comments=Coalesce(Sum("comments_amount"), 0),
+        )
+
+    return cache.get_or_set(_author_stats_key(author_id), load, settings.AUTHOR_STATS_CACHE_TIMEOUT)
+
+
+async def awarm_sidebar():
+    """
+    Заполняет кеш боковой панели в отдельных соединениях,
+    параллельно с основными запросами async-представления.
+    """
+    await asyncio.gather(
+        in_own_connection(get_total_posts)(),
+        in_own_connection(get_latest_comments)(5),
+        in_own_connection(get_trending_posts)(5),
+    )
+
+
+def invalidate_total_posts():
+    """Сбрасывает колличество постов после фиксации транзакции."""
+    transaction.on_commit(lambda: cache.delete(TOTAL_POSTS_KEY))
+
+
+def invalidate_latest_comments():
+    """Сбрасывает последние комментарии после фиксации транзакции."""
+    transaction.on_commit(lambda: cache.delete(LATEST_COMMENTS_KEY))
+
+
+def invalidate_trending_posts():
+    """Сбрасывает популярные посты после фиксации транзакции."""
+    transaction.on_commit(lambda: cache.delete(TRENDING_POSTS_KEY))
+
+
+def invalidate_author_stats(*author_ids):
+    """Сбрасывает статистику авторов после фиксации транзакции."""
+    keys = [_author_stats_key(author_id) for author_id in author_ids if author_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_tag_versions(tags):
+    """
+    Текущие версии тегов страниц из :model:`blog.PageTag`.
+
+    Версии читаются из основной базы: только что созданный тег
+    может ещё не дойти до реплики. Отсутствующая версия создаётся заново.
+    """
+    tags = list(tags)
+    tag_versions = PageTag.objects.using(DEFAULT_DB_ALIAS)
+    versions = dict(tag_versions.filter(name__in=tags).values_list("name", "version"))
+    missing = [tag for tag in dict.fromkeys(tags) if tag not in versions]
+    if missing:
+        tag_versions.bulk_create([PageTag(name=tag, version=time.time_ns()) for tag in missing], ignore_conflicts=True)
+        versions.update(tag_versions.filter(name__in=missing).values_list("name", "version"))
+    return [versions[tag] for tag in tags]
+
+
+def _bump_page_tags(tags):
+    # Одинаковый порядок строк не даёт параллельным сбросам заблокировать друг друга.
+    PageTag.objects.bulk_create(
+        [PageTag(name=tag, version=time.time_ns()) for tag in sorted(tags)],
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["version"],
+    )
+
+
+def purge_page_tags(*tags):
+    """Делает устаревшими все страницы с тегами `tags` после фиксации транзакции."""
+    tags = list(dict.fromkeys(tag for tag in tags if tag))
+    if tags:
+        transaction.on_commit(lambda: _bump_page_tags(tags))
+
+
+def page_cache_key(request, tags):
+    """Ключ страницы: адрес запроса и версии всех её тегов."""
+    versions = ":".join(str(version) for version in get_tag_versions(tags))
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"{PAGE_CACHE_PREFIX}:{request.method}:{url}:{hashlib.md5(versions.encode()).hexdigest()}"
+
+
+def _stats_key(view_name, outcome):
+    return f"{PAGE_CACHE_PREFIX}:stats:{view_name}:{outcome}"
+
+
+def record_page_cache(view_name, hit):
+    """Увеличивает счётчик попаданий или промахов кеша страниц."""
+    key = _stats_key(view_name, "hit" if hit else "miss")
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_page_cache_stats(view_names):
+    """Счётчики попаданий и промахов кеша страниц по представлениям."""
+    keys = {(name, outcome): _stats_key(name, outcome) for name in view_names for outcome in ("hit", "miss")}
+    values = cache.get_many(keys.values())
+    return {name: {outcome: values.get(keys[name, outcome], 0) for outcome in ("hit", "miss")} for name in view_names}
+
+
+def reset_page_cache_stats(view_names):
+    """Обнуляет счётчики кеша страниц."""
+    cache.delete_many([_stats_key(name, outcome) for name in view_names for outcome in ("hit", "miss")])
@@ -0,0 +1,200 @@
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from jobs.queue import job
+from user_profile.models import Profile
+from utils.pagination import CursorPaginator
+
+from .models import FeedEntry, Post
+
+FEED_BATCH_SIZE = 500
+
+Follows = Profile.follows.through
+
+
+def is_popular(author_id):
+    """Посты автора подмешиваются при чтении, а не рассылаются по лентам."""
+    return Profile.objects.filter(user_id=author_id, followers_amount__gte=settings.FEED_FANOUT_THRESHOLD).exists()
+
+
+def popular_author_ids(user):
+    """Идентификаторы популярных авторов, на которых подписан `user`."""
+    return list(
+        Follows.objects.filter(
+            to_profile__user_id=user.pk, from_profile__followers_amount__gte=settings.FEED_FANOUT_THRESHOLD
+        ).values_list("from_profile__user_id", flat=True)
+    )
+
+
+def trim_feeds(user_ids):
+    """
+    Оставляет в лентах пользователей `user_ids`
+    не больше ``FEED_MAX_LENGTH`` последних записей.
+
+    Returns:
+        Колличество удалённых записей.
+    """
+    overflow = (
+        FeedEntry.objects.filter(user_id__in=user_ids)
+        .annotate(
+            position=Window(
+                RowNumber(), partition_by=[F("user_id")], order_by=[F("post_date").desc(), F("post_id").desc()]
+            )
+        )
+        .filter(position__gt=settings.FEED_MAX_LENGTH)
+        .values_list("pk", flat=True)
+    )
+    pks = list(overflow)
+    if not pks:
+        return 0
+    return FeedEntry.objects.filter(pk__in=pks).delete()[0]
+
+
+@job
+def fan_out_post(post_id):
+    """
+    Добавляет пост в ленты подписчиков автора.
+
+    Посты популярных авторов пропускаются: их подмешивает :class:`FeedPaginator`.
+
+    Returns:
+        Колличество лент, в которые добавлен пост.
+    """
+    post = Post.objects.filter(pk=post_id).values("author_id", "post_date").first()
+    if post is None or is_popular(post["author_id"]):
+        return 0
+    user_ids = list(
+        Follows.objects.filter(from_profile__user_id=post["author_id"]).values_list("to_profile__user_id", flat=True)
+    )
+    for start in range(0, len(user_ids), FEED_BATCH_SIZE):
+        end = start + FEED_BATCH_SIZE
+        batch = user_ids[start:end]
+        FeedEntry.objects.bulk_create(
+            [FeedEntry(user_id=user_id, post_id=post_id, post_date=post["post_date"]) for user_id in batch],
+            ignore_conflicts=True,
+        )
+        trim_feeds(batch)
+    return len(user_ids)
+
+
+@job
+def fan_out_author(author_id):
+    """
+    Добавляет последние посты автора в ленты всех его подписчиков.
+
+    Выполняется, когда автор перестаёт быть популярным: его посты больше
+    не подмешиваются при чтении, а рассылки по лентам у них не было.
+
+    Returns:
+        Колличество лент, в которые добавлены посты.
+    """
+    if is_popular(author_id):
+        return 0
+    posts = list(
+        Post.objects.filter(author_id=author_id)
+        .order_by("-post_date", "-id")
+        .values_list("pk", "post_date")[: settings.FEED_MAX_LENGTH]
+    )
+    if not posts:
+        return 0
+    user_ids = list(
+        Follows.objects.filter(from_profile__user_id=author_id).values_list("to_profile__user_id", flat=True)
+    )
+    # Записей в пакете не больше FEED_BATCH_SIZE, сколько бы постов ни было у автора.
+    step = max(FEED_BATCH_SIZE // len(posts), 1)
+    for start in range(0, len(user_ids), step):
+        end = start + step
+        batch = user_ids[start:end]
+        FeedEntry.objects.bulk_create(
+            [FeedEntry(user_id=user_id, post_id=pk, post_date=date) for user_id in batch for pk, date in posts],
+            ignore_conflicts=True,
+        )
+        trim_feeds(batch)
+    return len(user_ids)
+
+
+def _profile_user_ids(*profile_ids):
+    users = dict(Profile.objects.filter(pk__in=profile_ids).values_list("pk", "user_id"))
+    return [users.get(pk) for pk in profile_ids]
+
+
+def add_author_to_feed(author_profile_id, follower_profile_id):
+    """После подписки добавляет последние посты автора в ленту подписчика."""
+    author_id, user_id = _profile_user_ids(author_profile_id, follower_profile_id)
+    if author_id is None or user_id is None or is_popular(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by("-post_date", "-id")[: settings.FEED_MAX_LENGTH]
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(user_id=user_id, post_id=pk, post_date=date) for pk, date in posts.values_list("pk", "post_date")],
+        ignore_conflicts=True,
+    )
+    trim_feeds([user_id])
+
+
+def remove_author_from_feed(author_profile_id, follower_profile_id):
+    """После отписки убирает посты автора из ленты бывшего подписчика."""
+    author_id, user_id = _profile_user_ids(author_profile_id, follower_profile_id)
+    FeedEntry.objects.filter(user_id=user_id, post__author_id=author_id).delete()
+
+
+@job
+def sync_follow_feed(author_profile_id, follower_profile_id):
+    """
+    Приводит ленту подписчика в соответствие с текущей подпиской на автора:
+    добавляет посты автора или убирает их.
+
+    Задача зависит только от итогового состояния подписки,
+    поэтому несколько переключений подряд обрабатываются одним выполнением.
+    """
+    following = Follows.objects.filter(from_profile_id=author_profile_id, to_profile_id=follower_profile_id).exists()
+    change_feed = add_author_to_feed if following else remove_author_from_feed
+    change_feed(author_profile_id, follower_profile_id)
+
+
+def rebuild_feed(user_id):
+    """Заново собирает ленту пользователя по его текущим подпискам."""
+    author_ids = Follows.objects.filter(
+        to_profile__user_id=user_id, from_profile__followers_amount__lt=settings.FEED_FANOUT_THRESHOLD
+    ).values("from_profile__user_id")
+    posts = Post.objects.filter(author_id__in=author_ids).order_by("-post_date", "-id")[: settings.FEED_MAX_LENGTH]
+    FeedEntry.objects.filter(user_id=user_id).delete()
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(user_id=user_id, post_id=pk, post_date=date) for pk, date in posts.values_list("pk", "post_date")]
+    )
+
+
+def feed_queryset(user, popular_ids):
+    """
+    Посты ленты `user`: записи его ленты
+    и посты популярных авторов `popular_ids`.
+    """
+    entries = FeedEntry.objects.filter(user_id=user.pk).values("post_id")
+    return Post.objects.filter(Q(pk__in=entries) | Q(author_id__in=popular_ids))
+
+
+class FeedPaginator(CursorPaginator):
+    """
+    Курсорный вывод ленты пользователя.
+
+    Страница собирается слиянием двух коротких выборок по индексам:
+    записей ленты пользователя и постов популярных авторов,
+    поэтому её стоимость не зависит от колличества подписок.
+    """
+
+    def __init__(self, object_list, per_page, user, popular_ids):
+        super().__init__(object_list, per_page, ("-post_date", "-id"))
+        self.sources = [(FeedEntry.objects.filter(user_id=user.pk), ["post_date", "post_id"])]
+        if popular_ids:
+            self.sources.append((Post.objects.filter(author_id__in=popular_ids), ["post_date", "id"]))
+
+    def fetch(self, values, forward, limit):
+        """Выбирает не больше `limit` постов ленты после позиции `values`."""
+        keys = set()
+        for queryset, fields in self.sources:
+            if values is not None:
+                queryset = queryset.filter(self._seek_filter(values, forward, fields))
+            keys.update(queryset.order_by(*self._ordering(forward, fields)).values_list(*fields)[:limit])
+        keys = sorted(keys, reverse=self.descending == forward)[:limit]
+        posts = self.object_list.in_bulk([pk for _, pk in keys])
+        return [posts[pk] for _, pk in keys if pk in posts]
@@ -0,0 +1,68 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Выгружает посты с комментариями в JSONL-файл для команды import_posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="JSONL-файл или «-» для стандартного вывода.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000, help="Колличество постов, читаемых из курсора за раз."
+        )
+        parser.add_argument("--category", help="Выгрузить только посты категории с этим slug.")
+        parser.add_argument("--author", help="Выгрузить только посты пользователя с этим именем.")
+
+    def handle(self, *args, **options):
+        """
+        Читает посты серверным курсором (`iterator`), поэтому память
+        не растёт с размером таблицы; комментарии подгружаются на каждую порцию.
+        """
+        posts = (
+            Post.objects.select_related("author", "category")
+            .prefetch_related(
+                Prefetch("comments", queryset=Comment.objects.select_related("author").order_by("pub_date", "id"))
+            )
+            .defer("search_vector", "thumbnail_widths")
+            .order_by("pk")
+        )
+        if options["category"]:
+            posts = posts.filter(category__slug=options["category"])
+        if options["author"]:
+            posts = posts.filter(author__username=options["author"])
+
+        output = sys.stdout if options["path"] == "-" else open(options["path"], "w", encoding="utf-8")
+        total = 0
+        try:
+            for post in posts.iterator(chunk_size=options["chunk_size"]):
+                output.write(json.dumps(self.serialize(post), ensure_ascii=False) + "\n")
+                total += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(self.style.SUCCESS(f"Выгружено постов: {total}."))
+
+    def serialize(self, post):
+        return {
+            "slug": post.slug,
+            "title": post.title,
+            "short_description": post.short_description,
+            "body": post.body,
+            "image": post.image.name or None,
+            "author": post.author.username,
+            "category": {
+                "slug": post.category.slug,
+                "name": post.category.name,
+                "description": post.category.description,
+            },
+            "post_date": post.post_date.isoformat(),
+            "comments": [
+                {"author": comment.author.username, "text": comment.text, "pub_date": comment.pub_date.isoformat()}
+                for comment in post.comments.all()
+            ],
+        }
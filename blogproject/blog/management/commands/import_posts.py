@@ -0,0 +1,182 @@
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.cache import (
+    invalidate_latest_comments,
+    invalidate_total_posts,
+    invalidate_trending_posts,
+    purge_page_tags,
+)
+from blog.models import Category, Comment, Post
+from blog.search import post_search_vector
+from blog.trending import initial_trending_score
+from user_profile.models import Profile
+from utils.utils import bulk_unique_slugify
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует посты с комментариями из JSONL-файла команды export_posts "
+        "пакетами bulk_create с возможностью продолжить прерванный импорт."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSONL-файл: один пост с комментариями в строке.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Колличество постов в одной транзакции.")
+        parser.add_argument(
+            "--resume", action="store_true", help="Продолжить с последнего сохранённого пакета (файл .checkpoint)."
+        )
+
+    def handle(self, *args, **options):
+        """Создаёт посты пакетами и один раз пересчитывает счётчики категорий в конце."""
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"Файл {path} не найден.")
+        checkpoint = path.with_name(f"{path.name}.checkpoint")
+        state = {"line": 0, "categories": []}
+        if options["resume"] and checkpoint.exists():
+            state = json.loads(checkpoint.read_text())
+            self.stdout.write(f"Продолжение со строки {state['line'] + 1}.")
+        elif checkpoint.exists():
+            raise CommandError(f"Найден {checkpoint}: продолжите импорт с --resume или удалите файл.")
+        categories = set(state["categories"])
+
+        with path.open(encoding="utf-8") as file:
+            lines = islice(file, state["line"], None)
+            while True:
+                batch = list(islice(lines, options["batch_size"]))
+                if not batch:
+                    break
+                records = [self.parse(state["line"] + index + 1, line) for index, line in enumerate(batch)]
+                records = [record for record in records if record is not None]
+                with transaction.atomic():
+                    categories.update(self.import_batch(records))
+                state["line"] += len(batch)
+                state["categories"] = sorted(categories)
+                # Отметка пишется после фиксации пакета: повторный запуск начнёт со следующего.
+                checkpoint.write_text(json.dumps(state))
+                self.stdout.write(f"Импортировано строк: {state['line']}")
+
+        Category.objects.filter(pk__in=categories).recount_post_amount()
+        invalidate_total_posts()
+        invalidate_latest_comments()
+        invalidate_trending_posts()
+        purge_page_tags("posts", "categories", "sidebar", "trending")
+        checkpoint.unlink()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Импорт завершён: строк {state['line']}. Ленты подписчиков обновит команда rebuild_feeds."
+            )
+        )
+
+    def parse(self, number, line):
+        if not line.strip():
+            return None
+        try:
+            record = json.loads(line)
+            for key in ("title", "body", "author"):
+                record[key]
+            record["category"]["slug"]
+        except (ValueError, KeyError, TypeError) as error:
+            raise CommandError(f"Строка {number}: неверная запись поста ({error}).")
+        return record
+
+    def import_batch(self, records):
+        """
+        Создаёт посты и комментарии пакета.
+
+        Returns:
+            Первичные ключи категорий импортированных постов.
+        """
+        users = self.get_users(
+            {record["author"] for record in records}
+            | {comment["author"] for record in records for comment in record.get("comments", [])}
+        )
+        categories = self.get_categories(records)
+
+        now = timezone.now()
+        posts = []
+        for record in records:
+            post = Post(
+                title=record["title"],
+                short_description=record.get("short_description"),
+                body=record["body"],
+                image=record.get("image") or "",
+                author=users[record["author"]],
+                category=categories[record["category"]["slug"]],
+                comments_amount=len(record.get("comments", [])),
+                search_vector=post_search_vector(record["title"], record["body"]),
+            )
+            self.set_date(post, "post_date", record)
+            # Последняя активность — самая поздняя из дат поста и его комментариев;
+            # комментарий без даты получит время импорта.
+            comment_dates = [self.parse_date(comment, "pub_date") or now for comment in record.get("comments", [])]
+            post.last_activity_at = max([post.post_date, *comment_dates])
+            post.trending_score = initial_trending_score(post.post_date, comments=post.comments_amount)
+            post.trending_scored_at = post.last_activity_at
+            posts.append(post)
+        for post in posts:
+            # bulk_create не вызывает save(), поэтому HTML, отрывок и оценка популярности готовятся здесь.
+            post.render_body()
+        bulk_unique_slugify(posts, [record.get("slug") or record["title"] for record in records])
+        posts = Post.objects.bulk_create(posts)
+
+        comments = []
+        for post, record in zip(posts, records):
+            for comment in record.get("comments", []):
+                comments.append(Comment(post=post, author=users[comment["author"]], text=comment["text"]))
+        comments = Comment.objects.bulk_create(comments)
+
+        # Даты комментариев заполняются автоматически, поэтому переносятся отдельным UPDATE.
+        sources = (comment for record in records for comment in record.get("comments", []))
+        dated_comments = [
+            comment for comment, source in zip(comments, sources) if self.set_date(comment, "pub_date", source)
+        ]
+        Comment.objects.bulk_update(dated_comments, ["pub_date"])
+        return {category.pk for category in categories.values()}
+
+    def parse_date(self, record, field_name):
+        value = record.get(field_name) and parse_datetime(record[field_name])
+        if value and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value or None
+
+    def set_date(self, instance, field_name, record):
+        value = self.parse_date(record, field_name)
+        if value:
+            setattr(instance, field_name, value)
+        return bool(value)
+
+    def get_users(self, usernames):
+        """Пользователи по именам; недостающие создаются без пароля вместе с профилями."""
+        users = {user.username: user for user in User.objects.filter(username__in=usernames)}
+        missing = [User(username=username) for username in sorted(usernames - users.keys())]
+        for user in missing:
+            user.set_unusable_password()
+        if missing:
+            missing = User.objects.bulk_create(missing)
+            # bulk_create не отправляет post_save, поэтому профили создаются явно.
+            profiles = [Profile(user=user) for user in missing]
+            bulk_unique_slugify(profiles, [user.username for user in missing])
+            Profile.objects.bulk_create(profiles)
+            users.update((user.username, user) for user in missing)
+        return users
+
+    def get_categories(self, records):
+        """Категории по slug; недостающие создаются с названием и описанием из файла."""
+        sources = {record["category"]["slug"]: record["category"] for record in records}
+        categories = {category.slug: category for category in Category.objects.filter(slug__in=sources)}
+        missing = [
+            Category(slug=slug, name=source.get("name") or slug, description=source.get("description") or "")
+            for slug, source in sources.items()
+            if slug not in categories
+        ]
+        categories.update((category.slug, category) for category in Category.objects.bulk_create(missing))
+        return categories
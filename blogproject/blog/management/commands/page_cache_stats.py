@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog import views
+from blog.cache import get_page_cache_stats, reset_page_cache_stats
+from blog.mixins import AnonymousPageCacheMixin
+
+
+class Command(BaseCommand):
+    help = "Показывает счётчики попаданий и промахов кеша страниц."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Обнулить счётчики после вывода.")
+
+    def handle(self, *args, **options):
+        """Выводит долю попаданий в кеш страниц по представлениям."""
+        view_names = sorted(
+            name
+            for name, view in vars(views).items()
+            if isinstance(view, type)
+            and issubclass(view, AnonymousPageCacheMixin)
+            and view.__module__ == views.__name__
+        )
+        for name, stats in get_page_cache_stats(view_names).items():
+            total = stats["hit"] + stats["miss"]
+            ratio = stats["hit"] / total if total else 0
+            self.stdout.write(
+                f"{name}: попаданий {stats['hit']}, промахов {stats['miss']}, доля попаданий {ratio:.1%}"
+            )
+        if options["reset"]:
+            reset_page_cache_stats(view_names)
+            self.stdout.write(self.style.SUCCESS("Счётчики обнулены."))
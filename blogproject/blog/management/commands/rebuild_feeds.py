@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from blog.feed import rebuild_feed
+from utils.utils import iterate_pk_batches
+
+
+class Command(BaseCommand):
+    help = "Заново собирает ленты пользователей по их текущим подпискам."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Колличество пользователей в одном пакете.")
+
+    def handle(self, *args, **options):
+        """Собирает ленты всех :model:`auth.User`, у которых есть подписки."""
+        readers = User.objects.filter(profile__followed_by__isnull=False).distinct()
+        total = 0
+        for pks in iterate_pk_batches(readers, options["batch_size"]):
+            for pk in pks:
+                rebuild_feed(pk)
+            total += len(pks)
+        self.stdout.write(self.style.SUCCESS(f"Собраны ленты {total} пользователей."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from utils.utils import iterate_pk_batches
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает поисковые векторы постов пакетами."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Колличество постов в одном UPDATE.")
+        parser.add_argument("--missing", action="store_true", help="Обновить только посты без поискового вектора.")
+
+    def handle(self, *args, **options):
+        """Пересчитывает `search_vector` у :model:`blog.Post`."""
+        queryset = Post.objects.all()
+        if options["missing"]:
+            queryset = queryset.filter(search_vector__isnull=True)
+        total = 0
+        for pks in iterate_pk_batches(queryset, options["batch_size"]):
+            total += Post.objects.filter(pk__in=pks).update_search_vector()
+        self.stdout.write(self.style.SUCCESS(f"Обновлены поисковые векторы у {total} постов."))
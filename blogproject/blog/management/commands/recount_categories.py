@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Category
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает колличество постов в категориях одним группирующим запросом."
+
+    def handle(self, *args, **options):
+        """Сверяет `post_amount` у всех :model:`blog.Category`."""
+        changed = Category.objects.recount_post_amount()
+        self.stdout.write(self.style.SUCCESS(f"Исправлены счётчики у {changed} категорий."))
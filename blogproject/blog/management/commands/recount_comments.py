@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from utils.utils import iterate_pk_batches
+
+
+class Command(BaseCommand):
+    help = "Заполняет и сверяет счётчики комментариев у постов пакетами."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Колличество постов в одном UPDATE.")
+
+    def handle(self, *args, **options):
+        """Пересчитывает `comments_amount` у всех :model:`blog.Post`."""
+        total = 0
+        for pks in iterate_pk_batches(Post.objects.all(), options["batch_size"]):
+            total += Post.objects.filter(pk__in=pks).recount_comments()
+        self.stdout.write(self.style.SUCCESS(f"Пересчитаны комментарии у {total} постов."))
@@ -0,0 +1,38 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from user_profile.models import Profile
+from utils.thumbnails import build_thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Создаёт миниатюры для уже загруженных изображений постов и профилей."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing", action="store_true", help="Обработать только изображения без миниатюр.")
+
+    def handle(self, *args, **options):
+        """Синхронно пересоздаёт производные изображения :model:`blog.Post` и :model:`user_profile.Profile`."""
+        targets = [
+            (Post, "image", "thumbnail_widths", Post.THUMBNAIL_WIDTHS, False),
+            (Profile, "profile_image", "profile_image_widths", Profile.IMAGE_WIDTHS, True),
+        ]
+        for model, field_name, widths_field, widths, square in targets:
+            queryset = model.objects.exclude(**{f"{field_name}__isnull": True}).exclude(**{field_name: ""})
+            if options["missing"]:
+                queryset = queryset.filter(**{widths_field: []})
+            total = failed = 0
+            for pk in queryset.values_list("pk", flat=True).iterator():
+                try:
+                    build_thumbnails(model._meta.label, pk, field_name, widths_field, widths, square)
+                except Exception:
+                    logger.exception("Не удалось создать миниатюры для %s %s", model._meta.label, pk)
+                    failed += 1
+                total += 1
+            self.stdout.write(
+                self.style.SUCCESS(f"{model._meta.verbose_name}: обработано изображений {total}, с ошибкой {failed}.")
+            )
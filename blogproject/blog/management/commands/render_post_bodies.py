@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import purge_page_tags
+from blog.models import Post
+from utils.utils import iterate_pk_batches
+
+RENDERED_FIELDS = ["body_html", "excerpt", "reading_time"]
+
+
+class Command(BaseCommand):
+    help = "Заново формирует очищенный HTML, отрывки и время чтения постов пакетами."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Колличество постов в одном UPDATE.")
+        parser.add_argument("--missing", action="store_true", help="Обработать только посты без очищенного HTML.")
+
+    def handle(self, *args, **options):
+        """Пересчитывает `body_html`, `excerpt` и `reading_time` у :model:`blog.Post`."""
+        queryset = Post.objects.all()
+        if options["missing"]:
+            queryset = queryset.filter(body_html="")
+        total = 0
+        for pks in iterate_pk_batches(queryset, options["batch_size"]):
+            posts = list(Post.objects.filter(pk__in=pks).only("pk", "slug", "body"))
+            for post in posts:
+                post.render_body()
+            total += Post.objects.bulk_update(posts, RENDERED_FIELDS)
+            purge_page_tags(*(f"post:{post.slug}" for post in posts))
+        purge_page_tags("posts", "categories")
+        self.stdout.write(self.style.SUCCESS(f"Обновлён HTML у {total} постов."))
@@ -0,0 +1,198 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.cache import (
+    invalidate_latest_comments,
+    invalidate_total_posts,
+    invalidate_trending_posts,
+    purge_page_tags,
+)
+from blog.feed import rebuild_feed
+from blog.models import Category, Comment, Post
+from user_profile.models import Profile
+from utils.utils import bulk_unique_slugify
+
+WORDS = (
+    "блог город дорога утро вечер книга музыка история письмо река море лес дом окно свет время "
+    "работа путь мысль идея вопрос ответ друг память осень зима весна лето небо поле сад мост "
+    "новый старый тихий быстрый долгий светлый тёмный простой важный главный каждый первый"
+).split()
+
+# Параметр распределения Парето: чем меньше, тем сильнее перекос активности.
+PARETO_ALPHA = 1.16
+
+SEED_PASSWORD = "seed-password"
+
+
+class Command(BaseCommand):
+    help = "Создаёт синтетические данные: пользователей, категории, посты, комментарии, likes и подписки."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Колличество пользователей.")
+        parser.add_argument("--categories", type=int, default=20, help="Колличество категорий.")
+        parser.add_argument("--posts", type=int, default=10000, help="Колличество постов.")
+        parser.add_argument("--comments", type=int, default=30000, help="Колличество комментариев.")
+        parser.add_argument("--likes", type=int, default=50000, help="Колличество likes.")
+        parser.add_argument("--follows", type=int, default=20000, help="Колличество подписок.")
+        parser.add_argument("--days", type=int, default=365, help="За сколько дней распределяются даты постов.")
+        parser.add_argument("--seed", type=int, default=42, help="Начальное значение генератора случайных чисел.")
+        parser.add_argument("--prefix", default="seed", help="Префикс имён создаваемых пользователей.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Колличество записей в одном INSERT.")
+
+    def handle(self, *args, **options):
+        """Создаёт данные пакетами `bulk_create` и пересчитывает счётчики."""
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Пользователи с префиксом «{prefix}» уже созданы, выберите другой --prefix.")
+        if options["users"] < 2 or options["categories"] < 1:
+            raise CommandError("Нужно хотя бы два пользователя и одна категория.")
+
+        users = self.create_users(prefix, options["users"])
+        profiles = self.create_profiles(users)
+        categories = self.create_categories(prefix, options["categories"])
+        posts = self.create_posts(users, categories, options["posts"], options["days"])
+        self.create_comments(users, posts, options["comments"])
+        self.create_likes(users, posts, options["likes"])
+        self.create_follows(profiles, options["follows"])
+        self.recount(users, profiles, categories, posts)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Созданы пользователи: {len(users)}, категории: {len(categories)}, посты: {len(posts)}."
+            )
+        )
+
+    def skewed_weights(self, amount):
+        """Веса по распределению Парето: немногие объекты получают большую часть активности."""
+        return [self.rng.paretovariate(PARETO_ALPHA) for _ in range(amount)]
+
+    def text(self, words):
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def create_users(self, prefix, amount):
+        # Хеш пароля вычисляется один раз: это самая медленная часть создания пользователя.
+        password = make_password(SEED_PASSWORD)
+        users = [User(username=f"{prefix}_{index:06d}", password=password) for index in range(amount)]
+        users = User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.stdout.write(f"Пользователи: {len(users)}")
+        return users
+
+    def create_profiles(self, users):
+        # bulk_create не отправляет post_save, поэтому профили создаются явно.
+        profiles = [Profile(user=user, bio=self.text(12)) for user in users]
+        bulk_unique_slugify(profiles, [user.username for user in users])
+        profiles = Profile.objects.bulk_create(profiles, batch_size=self.batch_size)
+        self.stdout.write(f"Профили: {len(profiles)}")
+        return profiles
+
+    def create_categories(self, prefix, amount):
+        categories = [
+            Category(name=f"{self.text(2).capitalize()} {index}", description=self.text(15)) for index in range(amount)
+        ]
+        bulk_unique_slugify(categories, [f"{prefix} {category.name}" for category in categories])
+        categories = Category.objects.bulk_create(categories, batch_size=self.batch_size)
+        self.stdout.write(f"Категории: {len(categories)}")
+        return categories
+
+    def create_posts(self, users, categories, amount, days):
+        authors = self.rng.choices(users, self.skewed_weights(len(users)), k=amount)
+        post_categories = self.rng.choices(categories, self.skewed_weights(len(categories)), k=amount)
+        posts = []
+        for index, (author, category) in enumerate(zip(authors, post_categories)):
+            paragraphs = "".join(f"<p>{self.text(self.rng.randint(30, 120))}</p>" for _ in range(3))
+            posts.append(
+                Post(
+                    title=f"{self.text(self.rng.randint(3, 7)).capitalize()} {index}",
+                    short_description=self.text(25),
+                    body=paragraphs,
+                    author=author,
+                    category=category,
+                )
+            )
+        for post in posts:
+            post.render_body()
+        bulk_unique_slugify(posts, [post.title for post in posts])
+        posts = Post.objects.bulk_create(posts, batch_size=self.batch_size)
+        # Дата добавления заполняется автоматически, поэтому распределяется отдельным UPDATE.
+        now = timezone.now()
+        offsets = sorted((self.rng.uniform(0, days * 86400) for _ in posts), reverse=True)
+        for post, offset in zip(posts, offsets):
+            post.post_date = now - timedelta(seconds=offset)
+        Post.objects.bulk_update(posts, ["post_date"], batch_size=self.batch_size)
+        self.stdout.write(f"Посты: {len(posts)}")
+        return posts
+
+    def create_comments(self, users, posts, amount):
+        if not posts:
+            return
+        now = timezone.now()
+        comment_posts = self.rng.choices(posts, self.skewed_weights(len(posts)), k=amount)
+        comments = [
+            Comment(post=post, author=self.rng.choice(users), text=self.text(self.rng.randint(5, 40)))
+            for post in comment_posts
+        ]
+        comments = Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+        for comment in comments:
+            age = (now - comment.post.post_date).total_seconds()
+            comment.pub_date = comment.post.post_date + timedelta(seconds=self.rng.uniform(0, age))
+        Comment.objects.bulk_update(comments, ["pub_date"], batch_size=self.batch_size)
+        self.stdout.write(f"Комментарии: {len(comments)}")
+
+    def create_likes(self, users, posts, amount):
+        if not posts:
+            return
+        pairs = set(
+            zip(
+                (post.pk for post in self.rng.choices(posts, self.skewed_weights(len(posts)), k=amount)),
+                (user.pk for user in self.rng.choices(users, k=amount)),
+            )
+        )
+        Likes = Post.likes.through
+        Likes.objects.bulk_create(
+            [Likes(post_id=post_id, user_id=user_id) for post_id, user_id in sorted(pairs)],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.stdout.write(f"Likes: {len(pairs)}")
+
+    def create_follows(self, profiles, amount):
+        # Подписчики распределены с перекосом: несколько авторов собирают большую часть подписок.
+        authors = self.rng.choices(profiles, self.skewed_weights(len(profiles)), k=amount)
+        followers = self.rng.choices(profiles, k=amount)
+        pairs = {(author.pk, follower.pk) for author, follower in zip(authors, followers) if author.pk != follower.pk}
+        Follows = Profile.follows.through
+        Follows.objects.bulk_create(
+            [
+                Follows(from_profile_id=author_id, to_profile_id=follower_id)
+                for author_id, follower_id in sorted(pairs)
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.stdout.write(f"Подписки: {len(pairs)}")
+
+    def recount(self, users, profiles, categories, posts):
+        """Заполняет счётчики, поисковые векторы, оценки популярности и ленты, которые bulk_create пропускает."""
+        Category.objects.filter(pk__in=[category.pk for category in categories]).recount_post_amount()
+        post_ids = [post.pk for post in posts]
+        for start in range(0, len(post_ids), self.batch_size):
+            end = start + self.batch_size
+            batch = Post.objects.filter(pk__in=post_ids[start:end])
+            batch.recount_likes()
+            batch.recount_comments()
+            batch.update_search_vector()
+            batch.update_trending_score()
+        Profile.objects.filter(pk__in=[profile.pk for profile in profiles]).recount_follows()
+        for user in users:
+            rebuild_feed(user.pk)
+        invalidate_total_posts()
+        invalidate_latest_comments()
+        invalidate_trending_posts()
+        purge_page_tags("posts", "categories", "sidebar", "trending")
+        self.stdout.write("Счётчики, поисковые векторы, оценки популярности и ленты пересчитаны.")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_trending_posts, purge_page_tags
+from blog.models import Post
+from blog.trending import update_trending_scores
+from utils.utils import iterate_pk_batches
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает оценки популярности постов, активность которых "
+        "изменилась после прошлого пересчёта. Запускается периодически (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Колличество постов в одном UPDATE.")
+        parser.add_argument(
+            "--full", action="store_true", help="Пересчитать оценки всех постов (например, после смены весов)."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Обновляет `trending_score` у :model:`blog.Post` с новой активностью.
+
+        Какие посты уже оценены, хранится в самих постах (`trending_scored_at`),
+        поэтому запуски не зависят от кеша и от времени прошлого запуска.
+        """
+        queryset = Post.objects.all() if options["full"] else Post.objects.trending_stale()
+        total = 0
+        for pks in iterate_pk_batches(queryset, options["batch_size"]):
+            total += update_trending_scores(Post.objects.filter(pk__in=pks))
+        if total:
+            invalidate_trending_posts()
+            purge_page_tags("trending", "sidebar")
+        since = "все посты" if options["full"] else "с новой активностью"
+        self.stdout.write(self.style.SUCCESS(f"Обновлены оценки популярности у {total} постов ({since})."))
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-18 03:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_likes_amount(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    likes = (
+        Post.likes.through.objects.filter(post_id=OuterRef("pk"))
+        .values("post_id")
+        .annotate(amount=Count("pk"))
+        .values("amount")
+    )
+    Post.objects.update(likes_amount=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0002_comment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="likes_amount",
+            field=models.PositiveIntegerField(default=0, verbose_name="Колличество likes"),
+        ),
+        migrations.RunPython(fill_likes_amount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0004_post_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-post_date", "-id"], name="blog_post_date_id_idx"),
+        ),
+    ]
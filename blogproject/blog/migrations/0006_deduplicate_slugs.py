@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 03:34
+
+from django.db import migrations
+from django.db.models import Count
+
+from utils.utils import SLUG_SUFFIX_RESERVE, _allocate_slugs
+
+
+def deduplicate_slugs(apps, schema_editor):
+    for model_name in ("Category", "Post"):
+        model = apps.get_model("blog", model_name)
+        max_length = model._meta.get_field("slug").max_length
+        duplicates = (
+            model.objects.order_by()
+            .values("slug")
+            .annotate(amount=Count("pk"))
+            .filter(amount__gt=1)
+            .values_list("slug", flat=True)
+        )
+        for slug in list(duplicates):
+            extra = list(model.objects.filter(slug=slug).order_by("pk")[1:])
+            # Суффиксы подбираются среди свободных: slug вида `foo-12` может уже быть у другой записи.
+            base = slug[: max_length - SLUG_SUFFIX_RESERVE].strip("-") or slug
+            for obj, new_slug in zip(extra, _allocate_slugs(model, [base] * len(extra))):
+                obj.slug = new_slug
+                obj.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0005_post_date_id_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_slugs, migrations.RunPython.noop),
+    ]
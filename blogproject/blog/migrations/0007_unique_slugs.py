@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0006_deduplicate_slugs"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="category",
+            name="slug",
+            field=models.SlugField(blank=True, max_length=200, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="slug",
+            field=models.SlugField(blank=True, max_length=200, unique=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0007_unique_slugs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="thumbnail_widths",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
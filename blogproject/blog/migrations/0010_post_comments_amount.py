@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-18 03:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_amount(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+    comments = (
+        Comment.objects.filter(post_id=OuterRef("pk"))
+        .order_by()
+        .values("post_id")
+        .annotate(amount=Count("pk"))
+        .values("amount")
+    )
+    Post.objects.update(comments_amount=Coalesce(Subquery(comments), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0009_feedentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comments_amount",
+            field=models.PositiveIntegerField(default=0, verbose_name="Колличество комментариев"),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["post", "pub_date", "id"], name="blog_comment_post_date_idx"),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="post",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="comments",
+                to="blog.post",
+                verbose_name="Пост",
+            ),
+        ),
+        migrations.RunPython(fill_comments_amount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+# Поля существующих постов заполняет команда render_post_bodies --missing:
+# очистка HTML меняется вместе с кодом приложения, а миграция не должна от него зависеть.
+# До этого страница поста очищает текст при каждом показе (см. :attr:`Post.body_display`).
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0010_post_comments_amount"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="body_html",
+            field=models.TextField(default="", editable=False, verbose_name="HTML текста"),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.TextField(default="", editable=False, verbose_name="Отрывок"),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="reading_time",
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name="Время чтения, мин"),
+        ),
+    ]
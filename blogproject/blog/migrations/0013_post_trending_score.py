@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-18 14:20
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import FloatField, Value
+from django.db.models.functions import Cast, Extract, Ln
+
+
+def fill_trending_score(apps, schema_editor):
+    # Формула оценки на момент миграции (см. ``blog/trending.py``).
+    Post = apps.get_model("blog", "Post")
+    engagement = (
+        Value(1.0)
+        + Cast("likes_amount", FloatField()) * Value(settings.TRENDING_LIKE_WEIGHT)
+        + Cast("comments_amount", FloatField()) * Value(settings.TRENDING_COMMENT_WEIGHT)
+    )
+    age = Cast(Extract("post_date", "epoch"), FloatField()) / Value(settings.TRENDING_DECAY_HOURS * 3600.0)
+    Post.objects.update(trending_score=Ln(engagement) + age)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0012_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="last_activity_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now, editable=False, verbose_name="Последняя активность"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="trending_score",
+            field=models.FloatField(default=0, editable=False, verbose_name="Популярность"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-trending_score", "-id"], name="blog_post_trending_idx"),
+        ),
+        migrations.RunPython(fill_trending_score, migrations.RunPython.noop),
+    ]
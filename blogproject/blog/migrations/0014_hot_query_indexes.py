@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 04:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("blog", "0013_post_trending_score"),
+    ]
+
+    # Составные индексы создаются до удаления индексов внешних ключей, которые они заменяют.
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["-pub_date", "-id"], name="blog_comment_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["category", "-post_date", "-id"], name="blog_post_category_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["author", "-post_date", "-id"], name="blog_post_author_date_idx"),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="author_post",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Автор",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="category",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to="blog.category"),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 17:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # У существующих постов `trending_scored_at` пустое:
+    # первый запуск update_trending после миграции пересчитает их оценки.
+    dependencies = [
+        ("blog", "0015_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="trending_scored_at",
+            field=models.DateTimeField(editable=False, null=True, verbose_name="Активность на момент оценки"),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="last_activity_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False, verbose_name="Последняя активность"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(
+                    ("trending_scored_at__isnull", True),
+                    models.Q(("trending_scored_at", models.F("last_activity_at")), _negated=True),
+                    _connector="OR",
+                ),
+                fields=["id"],
+                name="blog_post_trending_stale_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0016_post_trending_scored_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="trending_scored_at",
+            field=models.DateTimeField(
+                db_index=True, editable=False, null=True, verbose_name="Активность на момент оценки"
+            ),
+        ),
+    ]
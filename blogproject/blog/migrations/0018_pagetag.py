@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0017_post_trending_scored_at_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PageTag",
+            fields=[
+                ("name", models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name="Тег")),
+                ("version", models.BigIntegerField(verbose_name="Версия")),
+            ],
+        ),
+    ]
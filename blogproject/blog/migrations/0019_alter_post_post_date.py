@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 18:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0018_pagetag"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="post_date",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False, verbose_name="Дата добавления"
+            ),
+        ),
+    ]
@@ -1,6 +1,19 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.mixins import AccessMixin
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from utils.concurrency import aget_user
+from utils.pagination import CursorPaginator, EstimatedCountPaginator, InvalidCursor
+
+from .cache import get_tag_versions, page_cache_key, record_page_cache
 
 
 class AuthorRequiredMixin(AccessMixin):
@@ -13,3 +26,226 @@ class AuthorRequiredMixin(AccessMixin):
             messages.info(request, "Редактирование и удаление доступно только автору.")
             return redirect("blog:home")
         return super().dispatch(request, *args, **kwargs)
+
+
+class CursorPaginationMixin:
+    """
+    Курсорный постраничный вывод для :class:`ListView`.
+
+    При ``PAGINATION_MODE = "pages"`` используется нумерация страниц
+    с оценочным колличеством записей вместо COUNT(*).
+    """
+
+    cursor_ordering = ("-post_date", "-id")
+    cursor_kwarg = "cursor"
+    paginator_class = EstimatedCountPaginator
+    # Режим вывода представления; None — по настройке PAGINATION_MODE.
+    pagination_mode = None
+
+    def paginate_queryset(self, queryset, page_size):
+        """Разбить `queryset` на страницы по курсору или по номеру страницы."""
+        if (self.pagination_mode or settings.PAGINATION_MODE) != "cursor":
+            return super().paginate_queryset(queryset.order_by(*self.cursor_ordering), page_size)
+        paginator = self.get_cursor_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Неверный курсор страницы.")
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """Асинхронный вариант :meth:`paginate_queryset` для async-представлений."""
+        if (self.pagination_mode or settings.PAGINATION_MODE) != "cursor":
+            return await sync_to_async(self.paginate_queryset)(queryset, page_size)
+        paginator = self.get_cursor_paginator(queryset, page_size)
+        try:
+            page = await paginator.apage(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Неверный курсор страницы.")
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_cursor_paginator(self, queryset, page_size):
+        """Вернуть курсорный пагинатор для `queryset`."""
+        return CursorPaginator(queryset, page_size, self.cursor_ordering)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует страницу целиком для неаутентифицированных пользователей.
+
+    Ключ страницы включает версии тегов из :meth:`get_page_cache_tags`,
+    поэтому сохранение или удаление связанных объектов
+    (см. ``blog/signals.py``) сразу делает страницу устаревшей.
+    Включается настройкой ``PAGE_CACHE_ENABLED``.
+    """
+
+    page_cache_tags = ()
+
+    def get_page_cache_tags(self):
+        """Теги объектов, от которых зависит страница."""
+        return list(self.page_cache_tags)
+
+    def page_cache_allowed(self, request):
+        """Можно ли отдать или сохранить страницу в общем кеше."""
+        return (
+            settings.PAGE_CACHE_ENABLED
+            and request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+            and not len(messages.get_messages(request))
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+        response, key = self.get_cached_page(request)
+        if response is not None:
+            return response
+        return self.store_page(request, super().dispatch(request, *args, **kwargs), key)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        response, key = await sync_to_async(self.get_cached_page)(request)
+        if response is not None:
+            return response
+        response = await super().dispatch(request, *args, **kwargs)
+        return await sync_to_async(self.store_page)(request, response, key)
+
+    def get_cached_page(self, request):
+        """
+        Страница из кеша и ключ для сохранения новой страницы.
+
+        Returns:
+            Ответ из кеша или None и ключ страницы
+            или None, если страницу нельзя кешировать.
+        """
+        if not self.page_cache_allowed(request):
+            return None, None
+        key = page_cache_key(request, self.get_page_cache_tags())
+        response = cache.get(key)
+        record_page_cache(self.__class__.__name__, hit=response is not None)
+        if response is not None:
+            response["X-Page-Cache"] = "HIT"
+        return response, key
+
+    def store_page(self, request, response, key):
+        """Сохраняет ответ в кеш под ключом `key` после отрисовки."""
+        if key is None:
+            if settings.PAGE_CACHE_ENABLED:
+                patch_cache_control(response, private=True)
+            return response
+        if response.status_code != 200:
+            return response
+        patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+        patch_vary_headers(response, ("Cookie",))
+        response["X-Page-Cache"] = "MISS"
+
+        def store(response):
+            # Страница с CSRF-токеном или cookie привязана к конкретному клиенту.
+            if not response.cookies and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+                cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+
+        if hasattr(response, "render") and not response.is_rendered:
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 Not Modified на `If-None-Match` и `If-Modified-Since`,
+    не выполняя основных запросов представления и отрисовки.
+
+    Валидаторы строятся из даты изменения, которую возвращает
+    один агрегирующий запрос :meth:`get_last_modified`, версий тегов
+    страницы (сбрасываются и при удалении объектов) и пользователя.
+    """
+
+    # Теги, от которых страница зависит помимо тегов кеша страниц.
+    conditional_tags = ("sidebar",)
+
+    def get_last_modified(self):
+        """Дата последнего изменения данных страницы или None, если её не определить."""
+        return None
+
+    def get_conditional_tags(self):
+        """Теги страницы для валидаторов."""
+        page_tags = self.get_page_cache_tags() if hasattr(self, "get_page_cache_tags") else []
+        return [*page_tags, *self.conditional_tags]
+
+    def get_validators(self, request):
+        """
+        ETag и время последнего изменения страницы.
+
+        Returns:
+            Кортеж (ETag, метка времени в секундах) или None,
+            если страницу нельзя проверить.
+        """
+        if request.method not in ("GET", "HEAD") or len(messages.get_messages(request)):
+            return None
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return None
+        versions = get_tag_versions(self.get_conditional_tags())
+        timestamp = max([int(last_modified.timestamp()), *(version // 10**9 for version in versions)])
+        key = f"{request.user.pk}:{last_modified.isoformat()}:{':'.join(map(str, versions))}"
+        return quote_etag(hashlib.md5(key.encode()).hexdigest()), timestamp
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._aconditional_dispatch(request, *args, **kwargs)
+        validators = self.get_validators(request)
+        response = self.get_not_modified(request, validators)
+        if response is not None:
+            return response
+        return self.set_validators(super().dispatch(request, *args, **kwargs), validators)
+
+    async def _aconditional_dispatch(self, request, *args, **kwargs):
+        validators = await sync_to_async(self.get_validators)(request)
+        response = self.get_not_modified(request, validators)
+        if response is not None:
+            return response
+        return self.set_validators(await super().dispatch(request, *args, **kwargs), validators)
+
+    def get_not_modified(self, request, validators):
+        """Ответ 304 (или 412), если у клиента актуальная версия страницы."""
+        if validators is None:
+            return None
+        etag, timestamp = validators
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            self.set_validators(response, validators)
+        return response
+
+    def set_validators(self, response, validators):
+        """Добавляет к ответу `ETag` и `Last-Modified`; браузер проверяет страницу при каждом показе."""
+        if validators is None or response.status_code not in (200, 304):
+            return response
+        etag, timestamp = validators
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(timestamp)
+        if "max-age" not in response.get("Cache-Control", ""):
+            patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+
+class ReadReplicaMixin:
+    """
+    Представление только читает данные, поэтому его запросы
+    можно выполнять на репликах (см. ``utils/db_router.py``).
+    """
+
+    use_read_replica = True
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """
+    Проверяет что текущий пользователь аутентифицирован
+    в async-представлении, не обращаясь к сессии из цикла событий.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await aget_user(request)
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
@@ -1,19 +1,76 @@
 from ckeditor.fields import RichTextField
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+from django.dispatch import Signal
+from django.templatetags.static import static
 from django.urls import reverse
+from django.utils import timezone
 
-from utils.utils import unique_slugify
+from jobs.queue import enqueue, job
+from utils.html import render_body
+from utils.thumbnails import derivative_srcset, derivative_url, schedule_thumbnails
+from utils.utils import LoadedValuesMixin, UpdatedAtQuerySetMixin, save_with_unique_slug
+
+from .search import post_search_vector
+from .trending import initial_trending_score, update_trending_scores
+
+# Отправляется из :meth:`Post.toggle_like` с аргументами `user` и `liked`:
+# для автоматической таблицы likes Django не отправляет post_save и post_delete.
+like_toggled = Signal()
+
+
+class CategoryQuerySet(UpdatedAtQuerySetMixin, models.QuerySet):
+    """Набор запросов для :model:`blog.Category`."""
+
+    def recount_post_amount(self):
+        """
+        Пересчитывает поле `post_amount` одним группирующим запросом
+        по :model:`blog.Post`.
+
+        Строки категорий блокируются на время пересчёта, поэтому
+        параллельные атомарные изменения счётчика не теряются.
+
+        Returns:
+            Колличество исправленных категорий.
+        """
+        with transaction.atomic():
+            categories = list(self.select_for_update().only("pk", "post_amount").order_by("pk"))
+            amounts = dict(
+                Post.objects.filter(category__in=categories)
+                .order_by()
+                .values_list("category_id")
+                .annotate(amount=Count("pk"))
+            )
+            changed = []
+            for category in categories:
+                amount = amounts.get(category.pk, 0)
+                if category.post_amount != amount:
+                    category.post_amount = amount
+                    changed.append(category)
+            self.model.objects.bulk_update(changed, ["post_amount"], batch_size=500)
+        return len(changed)
 
 
 class Category(models.Model):
     """Хранит записи категорий."""
 
     name = models.CharField(verbose_name="Название категории", max_length=100)
-    slug = models.SlugField(max_length=200, blank=True)
+    slug = models.SlugField(max_length=200, blank=True, unique=True)
     description = models.TextField(verbose_name="Описание категории", max_length=300)
     post_amount = models.IntegerField(default=0)
+    # Меняется и при правке постов категории (см. ``blog/signals.py``).
+    updated_at = models.DateTimeField(verbose_name="Дата изменения", auto_now=True)
+
+    objects = CategoryQuerySet.as_manager()
+
+    class Meta:
+        # Подсказки поиска (см. ``blog/autocomplete.py``).
+        indexes = [GinIndex(fields=["name"], opclasses=["gin_trgm_ops"], name="blog_category_name_trgm_idx")]
 
     def __str__(self) -> str:
         """Возвращает строку в виде названия категории."""
@@ -21,25 +78,147 @@ class Category(models.Model):
 
     def save(self, *args, **kwargs):
         """Создание поля slug при его отсутствии."""
-        if not self.slug:
-            self.slug = unique_slugify(self, self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, self.name, super().save, *args, **kwargs)
+
 
+class PostQuerySet(UpdatedAtQuerySetMixin, models.QuerySet):
+    """Набор запросов для :model:`blog.Post`."""
 
-class Post(models.Model):
+    def with_liked_by(self, user):
+        """
+        Добавляет к постам признак `liked_by_current_user`
+        одним подзапросом EXISTS к таблице likes.
+        """
+        if not user.is_authenticated:
+            return self.annotate(liked_by_current_user=Value(False))
+        likes = self.model.likes.through.objects.filter(post_id=OuterRef("pk"), user_id=user.pk)
+        return self.annotate(liked_by_current_user=Exists(likes))
+
+    def recount_likes(self):
+        """
+        Сверяет поле `likes_amount` с таблицей likes.
+
+        Returns:
+            Колличество обновлённых постов.
+        """
+        likes = (
+            self.model.likes.through.objects.filter(post_id=OuterRef("pk"))
+            .values("post_id")
+            .annotate(amount=Count("pk"))
+            .values("amount")
+        )
+        return self.update(likes_amount=Coalesce(Subquery(likes), 0))
+
+    def recount_comments(self):
+        """
+        Сверяет поле `comments_amount` с таблицей комментариев.
+
+        Returns:
+            Колличество обновлённых постов.
+        """
+        comments = (
+            Comment.objects.filter(post_id=OuterRef("pk"))
+            .order_by()
+            .values("post_id")
+            .annotate(amount=Count("pk"))
+            .values("amount")
+        )
+        return self.update(comments_amount=Coalesce(Subquery(comments), 0))
+
+    def update(self, **kwargs):
+        """
+        Обновляет записи, пересчитывая `search_vector` в том же UPDATE,
+        если меняется заголовок или текст поста, и отмечая
+        активность поста при изменении счётчиков likes и комментариев.
+        """
+        if "search_vector" not in kwargs and kwargs.keys() & {"title", "body"}:
+            kwargs["search_vector"] = post_search_vector(kwargs.get("title"), kwargs.get("body"))
+        if kwargs.keys() & {"likes_amount", "comments_amount"}:
+            kwargs.setdefault("last_activity_at", Now())
+        return super().update(**kwargs)
+
+    def for_list(self):
+        """Посты для карточек в списках: без полного текста и поискового вектора."""
+        return self.defer("body", "body_html", "search_vector")
+
+    def update_search_vector(self):
+        """
+        Пересчитывает поисковый вектор постов.
+
+        Returns:
+            Колличество обновлённых постов.
+        """
+        return self.update(search_vector=post_search_vector())
+
+    def trending_stale(self):
+        """Посты, активность которых изменилась после пересчёта их оценки популярности."""
+        return self.filter(Q(trending_scored_at__isnull=True) | ~Q(trending_scored_at=F("last_activity_at")))
+
+    def update_trending_score(self):
+        """
+        Пересчитывает оценку популярности постов (см. ``blog/trending.py``).
+
+        Returns:
+            Колличество обновлённых постов.
+        """
+        return update_trending_scores(self)
+
+
+class Post(LoadedValuesMixin, models.Model):
     """
     Хранит записи постов,
     связанную с :model:`Category` и :model:`auth.User`.
     """
 
+    THUMBNAIL_WIDTHS = (320, 640, 960)
+    # Ширина изображения карточки поста в списках.
+    THUMBNAIL_CARD_WIDTH = 640
+    # Поля, которые меняются атомарными UPDATE в других запросах и задачах:
+    # сохранение существующего поста не записывает их устаревшие значения из памяти.
+    UPDATE_ONLY_FIELDS = frozenset(
+        {
+            "likes_amount",
+            "comments_amount",
+            "last_activity_at",
+            "trending_score",
+            "trending_scored_at",
+            "search_vector",
+            "thumbnail_widths",
+        }
+    )
+
     title = models.CharField(verbose_name="Заголовок", max_length=150)
-    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="author_post", verbose_name="Автор")
+    # Индексы по автору и категории покрывают составные индексы blog_post_author_date_idx и blog_post_category_date_idx.
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="author_post", verbose_name="Автор", db_index=False
+    )
     short_description = models.TextField(max_length=300, verbose_name="Краткое описание", null=True)
     body = RichTextField(verbose_name="Описание")
-    slug = models.SlugField(max_length=200, blank=True)
-    category = models.ForeignKey(Category, on_delete=models.PROTECT)
-    post_date = models.DateTimeField(verbose_name="Дата добавления", auto_now_add=True)
+    # Очищенный HTML текста, отрывок и время чтения вычисляются при сохранении.
+    body_html = models.TextField(verbose_name="HTML текста", default="", editable=False)
+    excerpt = models.TextField(verbose_name="Отрывок", default="", editable=False)
+    reading_time = models.PositiveSmallIntegerField(verbose_name="Время чтения, мин", default=1, editable=False)
+    slug = models.SlugField(max_length=200, blank=True, unique=True)
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, db_index=False)
+    # Заполняется в :meth:`save` при создании поста.
+    post_date = models.DateTimeField(verbose_name="Дата добавления", default=timezone.now, editable=False)
+    # Меняется и при изменении счётчиков и комментариев поста.
+    updated_at = models.DateTimeField(verbose_name="Дата изменения", auto_now=True)
     likes = models.ManyToManyField(User, blank=True, related_name="post_likes")
+    likes_amount = models.PositiveIntegerField(verbose_name="Колличество likes", default=0)
+    comments_amount = models.PositiveIntegerField(verbose_name="Колличество комментариев", default=0)
+    # Оценка популярности (см. ``blog/trending.py``) пересчитывается командой update_trending
+    # для постов, активность которых изменилась после прошлого пересчёта.
+    trending_score = models.FloatField(verbose_name="Популярность", default=0, editable=False)
+    last_activity_at = models.DateTimeField(verbose_name="Последняя активность", default=timezone.now, editable=False)
+    # Значение `last_activity_at`, с которым посчитана оценка; пустое, если поста ещё не оценивали.
+    # Индекс нужен для даты изменения страницы популярных постов.
+    trending_scored_at = models.DateTimeField(
+        verbose_name="Активность на момент оценки", null=True, db_index=True, editable=False
+    )
     image = models.ImageField(
         null=True,
         blank=True,
@@ -47,15 +226,95 @@ class Post(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=["png", "jpg", "webp", "jpeg"])],
     )
 
+    thumbnail_widths = models.JSONField(default=list, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="blog_post_search_vector_idx"),
+            models.Index(fields=["-post_date", "-id"], name="blog_post_date_id_idx"),
+            models.Index(fields=["-trending_score", "-id"], name="blog_post_trending_idx"),
+            # Посты, которые ждут пересчёта оценки популярности командой update_trending.
+            models.Index(
+                fields=["id"],
+                condition=Q(trending_scored_at__isnull=True) | ~Q(trending_scored_at=F("last_activity_at")),
+                name="blog_post_trending_stale_idx",
+            ),
+            models.Index(fields=["category", "-post_date", "-id"], name="blog_post_category_date_idx"),
+            models.Index(fields=["author", "-post_date", "-id"], name="blog_post_author_date_idx"),
+            # Подсказки поиска по заголовку с опечатками (см. ``blog/autocomplete.py``).
+            GinIndex(fields=["title"], opclasses=["gin_trgm_ops"], name="blog_post_title_trgm_idx"),
+        ]
+
     def __str__(self) -> str:
         """Возвращает строку в виде заголовка статьи."""
         return self.title
 
     def save(self, *args, **kwargs):
-        """Создание поля slug при его отсутствии."""
-        if not self.slug:
-            self.slug = unique_slugify(self, self.title)
-        super().save(*args, **kwargs)
+        """
+        Создание поля slug при его отсутствии,
+        очищенный HTML при изменении текста, оценка популярности нового поста,
+        а также постановка в очередь
+        пересчёта поискового вектора и создания миниатюр.
+
+        Существующий пост сохраняется без ``UPDATE_ONLY_FIELDS``,
+        чтобы не затереть параллельные изменения счётчиков.
+        """
+        adding = self._state.adding
+        search_changed = self.has_changed("title", "body")
+        image_changed = self.has_changed("image")
+        if not adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = self.saved_field_names(image_changed)
+        if self.has_changed("body"):
+            self.render_body()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "body_html", "excerpt", "reading_time"}
+        if image_changed:
+            self.thumbnail_widths = []
+        if adding:
+            # Дата задаётся заранее, чтобы оценка попала в тот же INSERT.
+            self.post_date = timezone.now()
+            self.trending_score = initial_trending_score(self.post_date, self.likes_amount, self.comments_amount)
+            self.trending_scored_at = self.last_activity_at
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, self.title, super().save, *args, **kwargs)
+        if search_changed:
+            enqueue(refresh_search_vector, self.pk, key=f"search_vector:{self.pk}")
+        if image_changed and self.image:
+            schedule_thumbnails(self, "image", "thumbnail_widths", self.THUMBNAIL_WIDTHS)
+        self.remember_loaded_values()
+
+    def saved_field_names(self, image_changed):
+        """
+        Поля, которые записывает сохранение существующего поста: загруженные
+        из базы данных, кроме ``UPDATE_ONLY_FIELDS``. Сброшенный при смене
+        изображения список миниатюр записывается.
+        """
+        excluded = self.UPDATE_ONLY_FIELDS - ({"thumbnail_widths"} if image_changed else set())
+        deferred = self.get_deferred_fields()
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname not in deferred and field.name not in excluded
+        }
+
+    @property
+    def body_display(self):
+        """
+        Очищенный HTML текста для страницы поста.
+
+        У постов, созданных до появления `body_html` и ещё не обработанных
+        командой render_post_bodies, HTML вычисляется при каждом обращении.
+        """
+        return self.body_html or render_body(self.body)[0]
+
+    def render_body(self):
+        """Заполняет `body_html`, `excerpt` и `reading_time` по тексту поста."""
+        self.body_html, self.excerpt, self.reading_time = render_body(self.body)
 
     def get_absolute_url(self):
         """Возвращает ссылку на пост, по идентификатору slug."""
@@ -63,15 +322,96 @@ class Post(models.Model):
 
     def total_likes(self):
         """Возвращает колличество likes."""
-        return self.likes.count()
+        return self.likes_amount
+
+    def toggle_like(self, user):
+        """
+        Ставит или снимает like пользователя `user`.
+
+        Счётчик `likes_amount` меняется атомарным UPDATE
+        в той же транзакции, что и запись в таблице likes.
+
+        Returns:
+            bool: True, если like поставлен.
+        """
+        through = self.likes.through
+        with transaction.atomic():
+            deleted, _ = through.objects.filter(post_id=self.pk, user_id=user.pk).delete()
+            if deleted:
+                delta = -1
+            else:
+                try:
+                    with transaction.atomic():
+                        through.objects.create(post_id=self.pk, user_id=user.pk)
+                except IntegrityError:
+                    # Параллельный запрос уже поставил этот like и учёл его в счётчике.
+                    return True
+                delta = 1
+            Post.objects.filter(pk=self.pk).update(likes_amount=F("likes_amount") + delta)
+            like_toggled.send(sender=Post, instance=self, user=user, liked=delta > 0)
+        self.likes_amount += delta
+        return delta > 0
 
     @property
     def get_thumbnail(self):
-        """Получение заглушки при отсутсвии изображения."""
+        """
+        Получение заглушки при отсутсвии изображения.
+
+        Если миниатюры готовы, возвращается JPEG размера карточки,
+        иначе — оригинал.
+        """
         if not self.image:
-            return "/static/img/placeholder.png"
+            return static("img/placeholder.png")
+        if self.thumbnail_widths:
+            width = max((w for w in self.thumbnail_widths if w <= self.THUMBNAIL_CARD_WIDTH), default=None)
+            return derivative_url(self.image, width or min(self.thumbnail_widths))
         return self.image.url
 
+    @property
+    def get_thumbnail_srcset(self):
+        """Значение `srcset` из миниатюр WebP или пустая строка."""
+        if not self.image or not self.thumbnail_widths:
+            return ""
+        return derivative_srcset(self.image, self.thumbnail_widths)
+
+    @property
+    def get_thumbnail_jpeg_srcset(self):
+        """Значение `srcset` из миниатюр JPEG или пустая строка."""
+        if not self.image or not self.thumbnail_widths:
+            return ""
+        return derivative_srcset(self.image, self.thumbnail_widths, "jpg")
+
+
+@job
+def refresh_search_vector(post_id):
+    """Пересчитывает поисковый вектор :model:`blog.Post` по текущим заголовку и тексту."""
+    Post.objects.filter(pk=post_id).update_search_vector()
+
+
+class FeedEntry(models.Model):
+    """
+    Хранит записи ленты пользователя:
+    посты авторов, на которых он подписан,
+    связанную с :model:`Post` и :model:`auth.User`.
+
+    Дата поста копируется в запись, чтобы страница ленты
+    читалась по одному индексу без соединения с постами.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="feed_entries", verbose_name="Читатель", db_index=False
+    )
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="feed_entries", verbose_name="Пост")
+    post_date = models.DateTimeField(verbose_name="Дата добавления поста")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "post"], name="blog_feedentry_user_post_uniq")]
+        indexes = [models.Index(fields=["user", "-post_date", "-post"], name="blog_feed_user_date_idx")]
+
+    def __str__(self) -> str:
+        """Возвращает строку в виде читателя и заголовка поста."""
+        return f"{self.user} {self.post.title}"
+
 
 class Comment(models.Model):
     """
@@ -79,12 +419,23 @@ class Comment(models.Model):
     связанную с :model:`Post` и :model:`auth.User`.
     """
 
-    post = models.ForeignKey(Post, on_delete=models.CASCADE, verbose_name="Пост", related_name="comments")
+    # Индекс по посту покрывает составной индекс blog_comment_post_date_idx.
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, verbose_name="Пост", related_name="comments", db_index=False
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, verbose_name="Автор комментария", related_name="comments_author"
     )
     text = models.TextField(verbose_name="Текст комментария", max_length=1500)
     pub_date = models.DateTimeField(verbose_name="Дата добавления", auto_now_add=True)
+    updated_at = models.DateTimeField(verbose_name="Дата изменения", auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["post", "pub_date", "id"], name="blog_comment_post_date_idx"),
+            # Последние комментарии боковой панели.
+            models.Index(fields=["-pub_date", "-id"], name="blog_comment_date_id_idx"),
+        ]
 
     def __str__(self) -> str:
         """
@@ -96,3 +447,20 @@ class Comment(models.Model):
     def get_absolute_url(self):
         """Возвращает ссылку на пост, по идентификатору slug."""
         return reverse("blog:post_detail", kwargs={"slug": self.post.slug})
+
+
+class PageTag(models.Model):
+    """
+    Версия тега кеша страниц и валидаторов ETag (см. ``blog/cache.py``).
+
+    Версии хранятся в базе данных, а не в кеше, чтобы сброс тега
+    из команд (update_trending, import_posts) видели все процессы сервера
+    даже с кешем в памяти процесса.
+    """
+
+    name = models.CharField(verbose_name="Тег", max_length=255, primary_key=True)
+    version = models.BigIntegerField(verbose_name="Версия")
+
+    def __str__(self) -> str:
+        """Возвращает строку в виде тега и его версии."""
+        return f"{self.name}: {self.version}"
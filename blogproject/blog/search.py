@@ -0,0 +1,59 @@
+from django.contrib.postgres.search import SearchHeadline, SearchVector
+from django.db.models import F, Func, TextField, Value
+from django.db.models.expressions import Combinable
+from django.db.models.functions import Left
+
+SEARCH_CONFIG = "russian"
+
+HEADLINE_SOURCE_LENGTH = 5000
+
+
+class StripTags(Func):
+    """Удаляет HTML-теги из текста на стороне базы данных."""
+
+    function = "REGEXP_REPLACE"
+    output_field = TextField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(expression, Value("<[^>]+>"), Value(" "), Value("g"), **extra)
+
+
+def _as_expression(value, field_name):
+    """Оборачивает значение поля в выражение для SQL."""
+    if value is None:
+        return F(field_name)
+    if isinstance(value, Combinable):
+        return value
+    return Value(value, output_field=TextField())
+
+
+def post_search_vector(title=None, body=None):
+    """
+    Взвешенный поисковый вектор :model:`blog.Post`:
+    заголовок с весом A, текст поста с весом B.
+
+    Новые значения `title` и `body` передаются явно,
+    когда вектор пересчитывается в том же UPDATE, что и поля.
+    """
+    return SearchVector(_as_expression(title, "title"), weight="A", config=SEARCH_CONFIG) + SearchVector(
+        _as_expression(body, "body"), weight="B", config=SEARCH_CONFIG
+    )
+
+
+def post_search_headline(query, max_words=35, min_words=15, max_fragments=2):
+    """
+    Фрагмент текста поста с подсветкой найденных слов.
+
+    Теги и длина исходного текста ограничиваются,
+    чтобы `ts_headline` не разбирал весь пост целиком.
+    """
+    return SearchHeadline(
+        Left(StripTags("body"), HEADLINE_SOURCE_LENGTH),
+        query,
+        config=SEARCH_CONFIG,
+        start_sel="<mark>",
+        stop_sel="</mark>",
+        max_words=max_words,
+        min_words=min_words,
+        max_fragments=max_fragments,
+    )
@@ -1,7 +1,31 @@
-from django.db.models.signals import post_delete, post_save
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Post
+from jobs.queue import enqueue
+from user_profile.models import Profile, follow_toggled
+
+from .cache import (
+    invalidate_author_stats,
+    invalidate_latest_comments,
+    invalidate_total_posts,
+    invalidate_trending_posts,
+    purge_page_tags,
+)
+from .feed import fan_out_author, fan_out_post, sync_follow_feed
+from .models import Category, Comment, Post, like_toggled
+
+
+def change_post_amount(category_id, delta):
+    """Атомарно изменяет счётчик постов :model:`blog.Category`."""
+    Category.objects.filter(pk=category_id).update(post_amount=F("post_amount") + delta)
+
+
+def enqueue_follow_feed(author_profile_id, follower_profile_id):
+    """Ставит в очередь :func:`blog.feed.sync_follow_feed` для пары профилей."""
+    key = f"sync_follow_feed:{author_profile_id}:{follower_profile_id}"
+    enqueue(sync_follow_feed, author_profile_id, follower_profile_id, key=key)
 
 
 @receiver(post_save, sender=Post)
@@ -10,11 +34,24 @@ def category_games_amount_post_save(sender, instance, created, *args, **kwargs):
     После сохранения экземпляра :model:`blog.Post`,
     связанную с :model:`blog.Category`.
 
-    Значение поля :model:`blog.Category` увеличивается на единицу.
+    Значение поля :model:`blog.Category` увеличивается на единицу,
+    кеш колличества постов сбрасывается.
+    При переносе поста в другую категорию счётчик
+    старой категории уменьшается, а новой — увеличивается,
+    при прочих изменениях категория отмечается изменённой.
     """
     if created:
-        instance.category.post_amount += 1
-        instance.category.save()
+        change_post_amount(instance.category_id, 1)
+        invalidate_total_posts()
+        return
+    old_category_id = instance.get_loaded_value("category")
+    if old_category_id is not None and old_category_id != instance.category_id:
+        # Порядок по pk исключает взаимную блокировку при встречных переносах.
+        for category_id, delta in sorted([(old_category_id, -1), (instance.category_id, 1)]):
+            change_post_amount(category_id, delta)
+    else:
+        # Дата изменения категории — валидатор страниц списков постов (см. ConditionalGetMixin).
+        Category.objects.filter(pk=instance.category_id).touch()
 
 
 @receiver(post_delete, sender=Post)
@@ -23,7 +60,203 @@ def category_games_amount_post_delete(sender, instance, *args, **kwargs):
     После удаления экземпляра :model:`blog.Post`
     связанную с :model:`blog.Category`.
 
-    Значение поля :model:`blog.Category` уменьшается на единицу.
+    Значение поля :model:`blog.Category` уменьшается на единицу,
+    кеш колличества постов и популярных постов сбрасывается.
+    """
+    change_post_amount(instance.category_id, -1)
+    invalidate_total_posts()
+    invalidate_trending_posts()
+
+
+@receiver(post_save, sender=Comment)
+def comments_amount_post_save(sender, instance, created, *args, **kwargs):
+    """
+    После создания экземпляра :model:`blog.Comment`
+    счётчик комментариев :model:`blog.Post` увеличивается на единицу,
+    после изменения пост отмечается изменённым.
+    """
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(comments_amount=F("comments_amount") + 1)
+    else:
+        Post.objects.filter(pk=instance.post_id).touch()
+
+
+@receiver(post_delete, sender=Comment)
+def comments_amount_post_delete(sender, instance, *args, origin=None, **kwargs):
+    """
+    После удаления экземпляра :model:`blog.Comment`
+    счётчик комментариев :model:`blog.Post` уменьшается на единицу.
+    При удалении самого поста счётчик не меняется.
+    """
+    if isinstance(origin, Post):
+        return
+    Post.objects.filter(pk=instance.post_id).update(comments_amount=F("comments_amount") - 1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def latest_comments_changed(sender, instance, *args, **kwargs):
+    """
+    После сохранения или удаления экземпляра :model:`blog.Comment`
+    сбрасывает кеш последних комментариев.
+    """
+    invalidate_latest_comments()
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def post_likes_changed(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    """
+    После изменения likes через связь many-to-many
+    (например, из админ-панели) пересчитывает
+    счётчик `likes_amount` у затронутых :model:`blog.Post`.
+    """
+    if reverse and action == "pre_clear":
+        instance._cleared_post_ids = list(instance.post_likes.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        post_ids = [instance.pk]
+    elif action == "post_clear":
+        post_ids = instance.__dict__.pop("_cleared_post_ids", [])
+    else:
+        post_ids = pk_set
+    if post_ids:
+        posts = Post.objects.filter(pk__in=post_ids)
+        posts.recount_likes()
+        invalidate_author_stats(*set(posts.values_list("author_id", flat=True)))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_author_stats_changed(sender, instance, *args, created=True, **kwargs):
+    """
+    После создания, удаления или смены автора экземпляра :model:`blog.Post`
+    сбрасывает кеш статистики автора (см. :func:`blog.cache.get_author_stats`).
+    """
+    # post_delete не передаёт `created`: удаление обрабатывается как создание.
+    old_author_id = instance.get_loaded_value("author")
+    if created or old_author_id != instance.author_id:
+        invalidate_author_stats(instance.author_id, old_author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_author_stats_changed(sender, instance, *args, created=True, origin=None, **kwargs):
+    """
+    После создания или удаления экземпляра :model:`blog.Comment`
+    сбрасывает кеш статистики автора поста.
+    При удалении самого поста статистику сбрасывает сам пост.
+    """
+    if created and not isinstance(origin, Post):
+        invalidate_author_stats(instance.post.author_id)
+
+
+@receiver(like_toggled, sender=Post)
+def like_author_stats_changed(sender, instance, *args, **kwargs):
+    """
+    После like или его отмены (см. :meth:`Post.toggle_like`)
+    сбрасывает кеш статистики автора поста.
+    """
+    invalidate_author_stats(instance.author_id)
+
+
+@receiver(like_toggled, sender=Post)
+def purge_liked_post_pages(sender, instance, *args, **kwargs):
+    """
+    После like или его отмены (см. :meth:`Post.toggle_like`)
+    сбрасывает кеш страницы поста со счётчиком likes.
+    """
+    purge_page_tags(f"post:{instance.slug}")
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, *args, **kwargs):
+    """
+    После сохранения или удаления экземпляра :model:`blog.Post`
+    сбрасывает кеш страниц поста, списков, его категорий и автора.
+    """
+    tags = [
+        "posts",
+        "categories",
+        "sidebar",
+        f"post:{instance.slug}",
+        f"category:{instance.category_id}",
+        f"author:{instance.author_id}",
+    ]
+    old_slug = instance.get_loaded_value("slug")
+    if old_slug and old_slug != instance.slug:
+        tags.append(f"post:{old_slug}")
+    old_category_id = instance.get_loaded_value("category")
+    if old_category_id and old_category_id != instance.category_id:
+        tags.append(f"category:{old_category_id}")
+    old_author_id = instance.get_loaded_value("author")
+    if old_author_id and old_author_id != instance.author_id:
+        tags.append(f"author:{old_author_id}")
+    purge_page_tags(*tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, *args, origin=None, **kwargs):
+    """
+    После сохранения или удаления экземпляра :model:`blog.Comment`
+    сбрасывает кеш страницы поста и страниц с боковой панелью.
+
+    При каскадном удалении вместе с постом страницы сбрасывает сам пост.
+    """
+    if isinstance(origin, Post):
+        return
+    purge_page_tags("sidebar", f"post:{instance.post.slug}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category_pages(sender, instance, *args, **kwargs):
+    """
+    После сохранения или удаления экземпляра :model:`blog.Category`
+    сбрасывает кеш страниц категорий и списков постов.
+    """
+    purge_page_tags("posts", "categories", f"category:{instance.pk}")
+
+
+@receiver(post_save, sender=Post)
+def post_fan_out(sender, instance, created, *args, **kwargs):
+    """
+    После создания экземпляра :model:`blog.Post`
+    ставит в очередь его добавление в ленты подписчиков автора.
+    """
+    if created:
+        enqueue(fan_out_post, instance.pk, key=f"fan_out_post:{instance.pk}")
+
+
+@receiver(follow_toggled, sender=Profile)
+def follow_feed_changed(sender, instance, follower, followed, *args, **kwargs):
+    """
+    После подписки или отписки (см. :meth:`Profile.toggle_follower`)
+    ставит в очередь обновление ленты подписчика.
+
+    Если после отписки автор перестал быть популярным, его посты
+    рассылаются по лентам остальных подписчиков: при чтении их больше не подмешивают.
+    """
+    enqueue_follow_feed(instance.pk, follower.pk)
+    # Счётчик уже уменьшен в этой транзакции, и строка заблокирована: переход порога видит одна отписка.
+    if (
+        not followed
+        and Profile.objects.filter(pk=instance.pk, followers_amount=settings.FEED_FANOUT_THRESHOLD - 1).exists()
+    ):
+        enqueue(fan_out_author, instance.user_id, key=f"fan_out_author:{instance.user_id}")
+
+
+@receiver(m2m_changed, sender=Profile.follows.through)
+def follows_feed_changed(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    """
+    После изменения подписок через связь many-to-many
+    (например, из админ-панели) ставит в очередь обновление лент подписчиков.
     """
-    instance.category.post_amount -= 1
-    instance.category.save()
+    if action not in ("post_add", "post_remove"):
+        return
+    for pk in pk_set:
+        author_id, follower_id = (pk, instance.pk) if reverse else (instance.pk, pk)
+        enqueue_follow_feed(author_id, follower_id)
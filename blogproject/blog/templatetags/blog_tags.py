@@ -1,6 +1,7 @@
 from django import template
 
-from blog.models import Comment, Post
+from blog.cache import get_latest_comments, get_total_posts, get_trending_posts
+from utils.db_router import read_from_replica
 
 register = template.Library()
 
@@ -13,7 +14,8 @@ def total_post():
     Returns:
         Колличество всех постов.
     """
-    return Post.objects.all().count()
+    with read_from_replica():
+        return get_total_posts()
 
 
 @register.inclusion_tag("comment/last_comments.html")
@@ -24,5 +26,17 @@ def show_latest_comments(count=5):
     Returns:
         Последние 5 комментариев.
     """
-    latest_comments = Comment.objects.all().order_by("-pub_date").select_related("author")[:count]
-    return {"latest_comments": latest_comments}
+    with read_from_replica():
+        return {"latest_comments": get_latest_comments(count)}
+
+
+@register.inclusion_tag("blog/trending_posts.html")
+def show_trending_posts(count=5):
+    """
+    :model:`blog.Post`.
+
+    Returns:
+        Самые популярные 5 постов.
+    """
+    with read_from_replica():
+        return {"trending_posts": get_trending_posts(count)}
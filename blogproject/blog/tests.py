@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+
+from utils.html import render_body
+
+
+class RenderBodyImageTests(SimpleTestCase):
+    """Размеры изображений в очищенном HTML поста (см. ``utils/html.py``)."""
+
+    def test_known_width_kept_for_external_image(self):
+        for img in (
+            '<img src="https://example.com/a.png" style="width:300px">',
+            '<img src="https://example.com/a.png" width="300">',
+        ):
+            with self.subTest(img=img):
+                html, _, _ = render_body(img)
+                self.assertIn('width="300"', html)
+                self.assertNotIn("height=", html)
+
+    def test_missing_dimension_derived_from_local_image(self):
+        html, _, _ = render_body('<img src="a.png" width="300">', image_size=lambda src: (600, 400))
+        self.assertIn('width="300" height="200"', html)
@@ -0,0 +1,49 @@
+import math
+
+from django.conf import settings
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Extract, Ln
+from django.utils import timezone
+
+
+def trending_score():
+    """
+    Оценка популярности :model:`blog.Post` с экспоненциальным затуханием.
+
+    Вес поста ``w = likes * TRENDING_LIKE_WEIGHT + comments * TRENDING_COMMENT_WEIGHT``
+    затухает как ``exp(-(now - post_date) / tau)``. Логарифм этой величины
+    отличается от ``ln(1 + w) + post_date / tau`` только общим для всех постов
+    слагаемым ``-now / tau``, поэтому хранится вторая форма: порядок постов тот же,
+    а оценка меняется только при новых likes и комментариях поста.
+    """
+    engagement = (
+        Value(1.0)
+        + Cast("likes_amount", FloatField()) * Value(settings.TRENDING_LIKE_WEIGHT)
+        + Cast("comments_amount", FloatField()) * Value(settings.TRENDING_COMMENT_WEIGHT)
+    )
+    age = Cast(Extract("post_date", "epoch"), FloatField()) / Value(settings.TRENDING_DECAY_HOURS * 3600.0)
+    return Ln(engagement) + age
+
+
+def initial_trending_score(post_date, likes=0, comments=0):
+    """Оценка :func:`trending_score`, вычисленная в Python, для записи при создании поста."""
+    engagement = 1.0 + likes * settings.TRENDING_LIKE_WEIGHT + comments * settings.TRENDING_COMMENT_WEIGHT
+    # Extract("post_date", "epoch") считает секунды по местному времени текущего часового пояса.
+    epoch = post_date.timestamp() + timezone.localtime(post_date).utcoffset().total_seconds()
+    return math.log(engagement) + epoch / (settings.TRENDING_DECAY_HOURS * 3600.0)
+
+
+def update_trending_scores(queryset):
+    """
+    Пересчитывает оценки популярности постов одним UPDATE.
+
+    Оценка не отображается на странице поста, поэтому `updated_at` не меняется.
+    В `trending_scored_at` запоминается активность, с которой посчитана оценка:
+    пока она не изменится, пост не пересчитывается (см. :meth:`PostQuerySet.trending_stale`).
+
+    Returns:
+        Колличество обновлённых постов.
+    """
+    return queryset.update(
+        trending_score=trending_score(), trending_scored_at=F("last_activity_at"), updated_at=F("updated_at")
+    )
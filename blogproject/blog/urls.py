@@ -1,20 +1,28 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+# Представления чтения и переключатели в async-варианте для ASGI.
+read_views = async_views if settings.ASYNC_READ_VIEWS else views
 
 app_name = "blog"
 
 urlpatterns = [
-    path("", views.PostListView.as_view(), name="home"),
+    path("", read_views.PostListView.as_view(), name="home"),
+    path("trending/", read_views.TrendingPostListView.as_view(), name="trending"),
     path("post/create/", views.PostCreateView.as_view(), name="post_create"),
-    path("post/<str:slug>/", views.PostDetailView.as_view(), name="post_detail"),
+    path("post/<str:slug>/", read_views.PostDetailView.as_view(), name="post_detail"),
     path("post/<str:slug>/update/", views.PostUpdateView.as_view(), name="post_update"),
     path("post/<str:slug>/delete/", views.PostDeleteView.as_view(), name="post_delete"),
+    path("post/<str:slug>/comments/", views.CommentListView.as_view(), name="comment_list"),
     path("post/<str:slug>/comment/", views.CommentCreateView.as_view(), name="comment_create"),
     path("post/<str:slug>/comment/<int:pk>/update/", views.CommentUpdateView.as_view(), name="comment_update"),
     path("post/<str:slug>/comment/<int:pk>/delete/", views.CommentDeleteView.as_view(), name="comment_delete"),
-    path("category_list/", views.CategoryListView.as_view(), name="category_list"),
+    path("category_list/", read_views.CategoryListView.as_view(), name="category_list"),
     path("category/<int:pk>/<str:slug>/", views.PostByCategoryListView.as_view(), name="category_detail"),
-    path("search/", views.PostSearchView.as_view(), name="search"),
-    path("like/", views.LikeCreateView.as_view(), name="like_post"),
+    path("feed/", views.FeedView.as_view(), name="feed"),
+    path("search/", read_views.PostSearchView.as_view(), name="search"),
+    path("search/autocomplete/", views.AutocompleteView.as_view(), name="autocomplete"),
+    path("like/", read_views.LikeCreateView.as_view(), name="like_post"),
 ]
@@ -1,16 +1,34 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Max, Subquery
+from django.db.models.functions import Greatest
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView, View
 
+from utils.pagination import CursorPaginator
+
+from .autocomplete import get_suggestions
+from .feed import FeedPaginator, feed_queryset, popular_author_ids
 from .forms import CommentCreateForm, PostCreateForm
-from .mixins import AuthorRequiredMixin
+from .mixins import (
+    AnonymousPageCacheMixin,
+    AuthorRequiredMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    ReadReplicaMixin,
+)
 from .models import Category, Comment, Post
+from .search import SEARCH_CONFIG, post_search_headline
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReadReplicaMixin, ConditionalGetMixin, AnonymousPageCacheMixin, DetailView):
     """
     Отображение отдельного объекта :model:`blog.Post`.
 
@@ -27,27 +45,51 @@ class PostDetailView(DetailView):
     template_name = "blog/post_detail.html"
     context_object_name = "post"
 
+    def get_page_cache_tags(self):
+        """Теги объектов, от которых зависит страница."""
+        return [f"post:{self.kwargs['slug']}"]
+
+    def get_last_modified(self):
+        """Дата изменения поста, его категории или профиля автора; комментарии меняют дату поста."""
+        return Post.objects.filter(slug=self.kwargs["slug"]).aggregate(
+            last_modified=Max(Greatest("updated_at", "category__updated_at", "author__profile__updated_at"))
+        )["last_modified"]
+
     def get_queryset(self):
         """Вернуть элемент для этого представления по идентификатору `slug`."""
         return (
             Post.objects.filter(slug=self.kwargs["slug"])
+            .with_liked_by(self.request.user)
             .select_related("author", "category")
-            .prefetch_related("comments__author", "author__profile")
+            .prefetch_related("author__profile")
         )
 
     def get_context_data(self, **kwargs):
-        """Получить контекст для этого представления."""
+        """
+        Получить контекст для этого представления.
+
+        В страницу встраивается только первая порция комментариев,
+        следующие загружаются из :view:`blog.views.CommentListView`.
+        """
         context = super().get_context_data(**kwargs)
-        liked = False
-        if self.object.likes.filter(id=self.request.user.id).exists():
-            liked = True
         context["total_likes"] = self.object.total_likes()
         context["title"] = self.object.title
-        context["liked"] = liked
+        context["liked"] = self.object.liked_by_current_user
+        context["comments"] = self.get_comments_page()
         return context
 
+    def get_comments_paginator(self, queryset):
+        """Вернуть курсорный пагинатор комментариев поста."""
+        return CursorPaginator(
+            queryset.select_related("author"), CommentListView.paginate_by, CommentListView.cursor_ordering
+        )
+
+    def get_comments_page(self):
+        """Первая порция комментариев поста."""
+        return self.get_comments_paginator(self.object.comments.all()).page()
 
-class PostListView(ListView):
+
+class PostListView(ReadReplicaMixin, ConditionalGetMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
     """
     Отображение списка объектов :model:`blog.Post`.
 
@@ -61,10 +103,15 @@ class PostListView(ListView):
     :template:`blog/post_list.html`
     """
 
-    queryset = Post.objects.all().order_by("-post_date").select_related("category").prefetch_related("author__profile")
+    queryset = Post.objects.for_list().select_related("category").prefetch_related("author__profile")
     template_name = "blog/post_list.html"
     context_object_name = "posts"
     paginate_by = 10
+    page_cache_tags = ("posts", "sidebar")
+
+    def get_last_modified(self):
+        """Любое изменение поста отмечается в его категории, поэтому достаточно таблицы категорий."""
+        return Category.objects.aggregate(last_modified=Max("updated_at"))["last_modified"]
 
     def get_context_data(self, **kwargs):
         """Получить контекст для этого представления."""
@@ -73,7 +120,54 @@ class PostListView(ListView):
         return context
 
 
-class PostByCategoryListView(ListView):
+class TrendingPostListView(
+    ReadReplicaMixin, ConditionalGetMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView
+):
+    """
+    Отображение списка объектов :model:`blog.Post`
+    по убыванию оценки популярности (см. ``blog/trending.py``).
+
+    **Context Object Name**
+
+    ``posts``
+        Экземпляр :model:`blog.Post`.
+
+    **Template:**
+
+    :template:`blog/post_list.html`
+    """
+
+    queryset = Post.objects.for_list().select_related("category").prefetch_related("author__profile")
+    template_name = "blog/post_list.html"
+    context_object_name = "posts"
+    paginate_by = 10
+    cursor_ordering = ("-trending_score", "-id")
+    page_cache_tags = ("posts", "trending", "sidebar")
+
+    def get_last_modified(self):
+        """
+        Изменения постов отмечаются в категориях, а пересчёт оценок —
+        в `trending_scored_at` пересчитанных постов.
+        """
+        last_scored = (
+            Post.objects.filter(trending_scored_at__isnull=False)
+            .order_by("-trending_scored_at")
+            .values("trending_scored_at")[:1]
+        )
+        return Category.objects.aggregate(last_modified=Greatest(Max("updated_at"), Subquery(last_scored)))[
+            "last_modified"
+        ]
+
+    def get_context_data(self, **kwargs):
+        """Получить контекст для этого представления."""
+        context = super().get_context_data(**kwargs)
+        context["title"] = "Популярное"
+        return context
+
+
+class PostByCategoryListView(
+    ReadReplicaMixin, ConditionalGetMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView
+):
     """
     Отображение списка объектов :model:`blog.Post`,
     связанную с :model:`blog.Category`.
@@ -93,15 +187,31 @@ class PostByCategoryListView(ListView):
     context_object_name = "posts"
     paginate_by = 10
 
+    def get_page_cache_tags(self):
+        """Теги объектов, от которых зависит страница."""
+        return [f"category:{self.kwargs['pk']}", "sidebar"]
+
+    def get_last_modified(self):
+        """Дата изменения категории, включая изменения её постов."""
+        return Category.objects.filter(pk=self.kwargs["pk"]).aggregate(last_modified=Max("updated_at"))[
+            "last_modified"
+        ]
+
     def get_queryset(self):
         """
         Вернуть список элементов для этого представления
         :model:`blog.Post` связанную с :model:`blog.Category`.
         """
-        self.category = Category.objects.get(pk=self.kwargs["pk"])
-        queryset = self.model.objects.all().filter(category_id=self.category.id).prefetch_related("author__profile")
+        self.category = get_object_or_404(Category, pk=self.kwargs["pk"])
+        queryset = (
+            self.model.objects.for_list().filter(category_id=self.category.id).prefetch_related("author__profile")
+        )
         return queryset
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Колличество постов категории берётся из :model:`blog.Category` без COUNT(*)."""
+        return super().get_paginator(queryset, per_page, count=self.category.post_amount, **kwargs)
+
     def get_context_data(self, **kwargs):
         """Получить контекст для этого представления."""
         context = super().get_context_data(**kwargs)
@@ -109,7 +219,7 @@ class PostByCategoryListView(ListView):
         return context
 
 
-class CategoryListView(ListView):
+class CategoryListView(ReadReplicaMixin, ConditionalGetMixin, AnonymousPageCacheMixin, ListView):
     """
     Отображение списка объектов :model:`blog.Category`.
 
@@ -125,8 +235,13 @@ class CategoryListView(ListView):
 
     template_name = "category/category_list.html"
     context_object_name = "categories"
-    queryset = Category.objects.order_by("-post_amount").all()
+    queryset = Category.objects.order_by("-post_amount", "pk")
     paginate_by = 5
+    page_cache_tags = ("categories", "sidebar")
+
+    def get_last_modified(self):
+        """Дата последнего изменения категорий."""
+        return Category.objects.aggregate(last_modified=Max("updated_at"))["last_modified"]
 
     def get_context_data(self, **kwargs):
         """Получить контекст для этого представления."""
@@ -135,7 +250,48 @@ class CategoryListView(ListView):
         return context
 
 
-class PostSearchView(LoginRequiredMixin, ListView):
+class FeedView(LoginRequiredMixin, ReadReplicaMixin, CursorPaginationMixin, ListView):
+    """
+    Отображение ленты объектов :model:`blog.Post`
+    авторов, на которых подписан пользователь.
+
+    **Context Object Name**
+
+    ``posts``
+        Экземпляр :model:`blog.Post`.
+
+    **Template:**
+
+    :template:`blog/post_list.html`
+    """
+
+    context_object_name = "posts"
+    login_url = "profile:login"
+    template_name = "blog/post_list.html"
+    paginate_by = 10
+
+    def get_queryset(self):
+        """Вернуть посты ленты текущего пользователя."""
+        self.popular_ids = popular_author_ids(self.request.user)
+        return (
+            feed_queryset(self.request.user, self.popular_ids)
+            .for_list()
+            .select_related("category")
+            .prefetch_related("author__profile")
+        )
+
+    def get_cursor_paginator(self, queryset, page_size):
+        """Вернуть пагинатор, объединяющий ленту с постами популярных авторов."""
+        return FeedPaginator(queryset, page_size, self.request.user, self.popular_ids)
+
+    def get_context_data(self, **kwargs):
+        """Получить контекст для этого представления."""
+        context = super().get_context_data(**kwargs)
+        context["title"] = "Моя лента"
+        return context
+
+
+class PostSearchView(LoginRequiredMixin, ReadReplicaMixin, ListView):
     """
     Отображение поиска списка объектов :model:`blog.Post`.
 
@@ -154,27 +310,56 @@ class PostSearchView(LoginRequiredMixin, ListView):
     allow_empty = True
     login_url = "profile:login"
     template_name = "blog/post_list.html"
+    paginate_by = 10
 
     def get_queryset(self):
-        """Вернуть список элементов для этого представления."""
-        q = self.request.GET.get("do")
-        vector = SearchVector("body", weight="B") + SearchVector("title", weight="A")
-        query = SearchQuery(q)
-        return self.model.objects.annotate(rank=SearchRank(vector, query)).filter(rank__gte=0.3).order_by("-rank")
+        """
+        Вернуть список элементов для этого представления,
+        отсортированный по релевантности.
+        """
+        q = self.request.GET.get("do", "").strip()
+        if not q:
+            return self.model.objects.none()
+        self.search_query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            self.model.objects.for_list()
+            .filter(search_vector=self.search_query)
+            .annotate(rank=SearchRank(F("search_vector"), self.search_query))
+            .order_by("-rank", "-post_date")
+            .select_related("category")
+            .prefetch_related("author__profile")
+        )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         """Получить контекст для этого представления."""
         context = super().get_context_data(**kwargs)
         context["title"] = "Результаты поиска"
-        context["do"] = f"do={self.request.GET.get('value')}&"
+        context["do"] = f"{urlencode({'do': self.request.GET.get('do', '')})}&"
+        if settings.SEARCH_HEADLINES:
+            self.add_headlines(context["posts"])
         return context
 
+    def add_headlines(self, posts):
+        """Добавляет фрагменты с подсветкой только к постам текущей страницы."""
+        posts = list(posts)
+        if not posts:
+            return
+        headlines = dict(
+            self.model.objects.filter(pk__in=[post.pk for post in posts])
+            .annotate(headline=post_search_headline(self.search_query))
+            .values_list("pk", "headline")
+        )
+        for post in posts:
+            post.headline = headlines.get(post.pk)
 
-class LikeCreateView(View):
+
+class LikeCreateView(LoginRequiredMixin, View):
     """
     Создание объекта likes :model:`blog.Post`.
     """
 
+    login_url = "profile:login"
+
     def post(self, request):
         """
         Получение объекта :model:`blog.Post`
@@ -184,13 +369,27 @@ class LikeCreateView(View):
             redirect: URL адрес объекта :model:`blog.Post`
         """
         post = get_object_or_404(Post, slug=request.POST.get("post_slug"))
-        if post.likes.filter(id=request.user.id).exists():
-            post.likes.remove(request.user)
-        else:
-            post.likes.add(request.user)
+        post.toggle_like(request.user)
         return redirect(post, permanent=True)
 
 
+class AutocompleteView(ReadReplicaMixin, View):
+    """
+    Подсказки поиска по мере ввода в формате JSON:
+    заголовки :model:`blog.Post` и названия :model:`blog.Category`,
+    похожие на параметр ``q`` с учётом опечаток.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns:
+            JsonResponse: списки ``posts`` и ``categories`` с полями ``title`` и ``url``.
+        """
+        response = JsonResponse(get_suggestions(request.GET.get("q", "")))
+        patch_cache_control(response, public=True, max_age=settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+        return response
+
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     """
     Создание объекта :model:`blog.Post`.
@@ -211,7 +410,6 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         для корректного сохранения данных.
         """
         form.instance.author = self.request.user
-        form.save()
         return super().form_valid(form)
 
     def get_context_data(self, **kwargs):
@@ -275,6 +473,63 @@ class PostDeleteView(AuthorRequiredMixin, DeleteView):
         return context
 
 
+class CommentListView(ReadReplicaMixin, ConditionalGetMixin, AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
+    """
+    Порция объектов :model:`blog.Comment` поста
+    в виде HTML-фрагмента или JSON (``?format=json``).
+
+    **Context Object Name**
+
+    ``comments``
+        Экземпляр :model:`blog.Comment`.
+
+    **Template:**
+
+    :template:`comment/comment_list.html`
+    """
+
+    template_name = "comment/comment_list.html"
+    context_object_name = "comments"
+    paginate_by = 20
+    cursor_ordering = ("pub_date", "id")
+    pagination_mode = "cursor"
+    conditional_tags = ()
+
+    def get_page_cache_tags(self):
+        """Теги объектов, от которых зависит страница."""
+        return [f"post:{self.kwargs['slug']}"]
+
+    def get_last_modified(self):
+        """Создание, изменение и удаление комментариев меняют дату изменения поста."""
+        return Post.objects.filter(slug=self.kwargs["slug"]).aggregate(last_modified=Max("updated_at"))[
+            "last_modified"
+        ]
+
+    def get_queryset(self):
+        """Вернуть комментарии поста по идентификатору `slug`."""
+        self.post = get_object_or_404(Post.objects.only("pk", "slug"), slug=self.kwargs["slug"])
+        return Comment.objects.filter(post=self.post).select_related("author")
+
+    def get_context_data(self, **kwargs):
+        """Получить контекст для этого представления."""
+        context = super().get_context_data(**kwargs)
+        context["post"] = self.post
+        context["comments"] = context["page_obj"]
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        """Вернуть HTML-фрагмент или JSON с фрагментом и ссылкой на следующую порцию."""
+        if self.request.GET.get("format") != "json":
+            return super().render_to_response(context, **response_kwargs)
+        page = context["page_obj"]
+        next_url = None
+        if page.has_next():
+            next_url = (
+                f"{reverse('blog:comment_list', args=[self.post.slug])}?{urlencode({'cursor': page.next_cursor})}"
+            )
+        return JsonResponse({"html": render_to_string(self.template_name, context, self.request), "next": next_url})
+
+
 class CommentCreateView(LoginRequiredMixin, CreateView):
     """
     Создание объекта :model:`blog.Comment`.
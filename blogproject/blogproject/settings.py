@@ -10,9 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,23 +41,35 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "blog.apps.BlogConfig",
     "user_profile.apps.UserProfileConfig",
+    "monitoring.apps.MonitoringConfig",
+    "jobs.apps.JobsConfig",
     "ckeditor",
-    "debug_toolbar",
 ]
 
+# Статические файлы отдаются раньше метрик и выбора базы данных:
+# их запросы не обращаются к базе и не должны попадать в метрики представлений.
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "utils.staticfiles.StaticFilesMiddleware",
+    "monitoring.middleware.RequestMetricsMiddleware",
+    "utils.db_router.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
 
+# Панель отладки подключается только в режиме отладки: её middleware
+# работает лишь синхронно и под ASGI переводила бы каждый запрос в поток.
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.append("debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "blogproject.urls"
 
 TEMPLATES = [
@@ -81,6 +94,10 @@ INTERNAL_IPS = [
 
 WSGI_APPLICATION = "blogproject.wsgi.application"
 
+# Async-варианты представлений чтения (blog.async_views, user_profile.async_views)
+# для запуска под ASGI-сервером.
+ASYNC_READ_VIEWS = config("ASYNC_READ_VIEWS", default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -95,6 +112,53 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: сервисы из pg_service.conf с весами,
+# например "db_replica_1:2,db_replica_2:1". Для проверки локально
+# достаточно второй базы с копией данных основной.
+DATABASE_REPLICA_WEIGHTS = {}
+
+for index, replica in enumerate(config("DATABASE_REPLICAS", default="", cast=Csv()), start=1):
+    service, _, weight = replica.partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "OPTIONS": {
+            "service": service,
+            "passfile": ".pgpass",
+        },
+        # Тесты читают с реплики ту же тестовую базу, что и основное соединение.
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICA_WEIGHTS[alias] = int(weight or 1)
+
+# Пул соединений psycopg_pool (utils/pooled_postgresql) для основной базы и реплик
+# вместо нового соединения на каждый запрос.
+DATABASE_POOL = config("DATABASE_POOL", default=False, cast=bool)
+
+if DATABASE_POOL:
+    for database in DATABASES.values():
+        database["ENGINE"] = "utils.pooled_postgresql"
+        database["OPTIONS"]["pool"] = {
+            "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+            # Сколько секунд запрос ждёт свободного соединения.
+            "timeout": config("DATABASE_POOL_TIMEOUT", default=5.0, cast=float),
+            # Соединение, простоявшее в пуле дольше, проверяется при выдаче.
+            "check_after": config("DATABASE_POOL_CHECK_AFTER", default=30.0, cast=float),
+        }
+
+DATABASE_ROUTERS = ["utils.db_router.PrimaryReplicaRouter"]
+
+# Сколько секунд после записи чтение пользователя идёт из основной базы.
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=10, cast=int)
+
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default="blogproject"),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -137,10 +201,109 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# При развёртывании (STATIC_MANIFEST=True) collectstatic добавляет к именам хеш содержимого
+# и сохраняет копии gzip и brotli (при установленном пакете brotli), см. utils/staticfiles.py.
+# С этим хранилищем {% static %} работает только после collectstatic,
+# поэтому в разработке, тестах и бенчмарках используется обычное.
+STATIC_MANIFEST = config("STATIC_MANIFEST", default=False, cast=bool)
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "utils.staticfiles.CompressedManifestStaticFilesStorage"
+            if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        )
+    },
+}
+
+# Раздача STATIC_ROOT самим приложением, если перед ним нет веб-сервера.
+STATIC_SERVE = config("STATIC_SERVE", default=not DEBUG, cast=bool)
+
 MEDIA_URL = ""
 
 MEDIA_ROOT = ""
 
+# "cursor" — курсорный постраничный вывод, "pages" — нумерация страниц.
+PAGINATION_MODE = config("PAGINATION_MODE", default="cursor")
+
+PAGINATION_ESTIMATE_THRESHOLD = config("PAGINATION_ESTIMATE_THRESHOLD", default=10000, cast=int)
+
+SIDEBAR_CACHE_TIMEOUT = config("SIDEBAR_CACHE_TIMEOUT", default=300, cast=int)
+
+# Статистика автора сбрасывается сигналами, срок хранения лишь страхует от пропущенных изменений.
+AUTHOR_STATS_CACHE_TIMEOUT = config("AUTHOR_STATS_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Кеш страниц целиком для неаутентифицированных пользователей.
+PAGE_CACHE_ENABLED = config("PAGE_CACHE_ENABLED", default=False, cast=bool)
+
+PAGE_CACHE_TIMEOUT = config("PAGE_CACHE_TIMEOUT", default=600, cast=int)
+
+PAGE_CACHE_MAX_AGE = config("PAGE_CACHE_MAX_AGE", default=60, cast=int)
+
+SEARCH_HEADLINES = config("SEARCH_HEADLINES", default=True, cast=bool)
+
+# Подсказки поиска по мере ввода (см. blog/autocomplete.py).
+AUTOCOMPLETE_LIMIT = config("AUTOCOMPLETE_LIMIT", default=5, cast=int)
+
+AUTOCOMPLETE_MIN_LENGTH = config("AUTOCOMPLETE_MIN_LENGTH", default=2, cast=int)
+
+AUTOCOMPLETE_CACHE_TIMEOUT = config("AUTOCOMPLETE_CACHE_TIMEOUT", default=60, cast=int)
+
+AUTOCOMPLETE_TIMEOUT_MS = config("AUTOCOMPLETE_TIMEOUT_MS", default=200, cast=int)
+
+# Фоновые задачи (миниатюры, ленты, поисковый вектор) выполняет команда run_jobs.
+# В режиме JOBS_EAGER задачи выполняются в процессе после фиксации транзакции, без воркера.
+JOBS_EAGER = config("JOBS_EAGER", default=DEBUG, cast=bool)
+
+JOBS_MAX_ATTEMPTS = config("JOBS_MAX_ATTEMPTS", default=5, cast=int)
+
+# Задержка повтора в секундах удваивается после каждой неудачной попытки.
+JOBS_RETRY_BACKOFF = config("JOBS_RETRY_BACKOFF", default=10, cast=int)
+
+JOBS_RETRY_BACKOFF_MAX = config("JOBS_RETRY_BACKOFF_MAX", default=3600, cast=int)
+
+# Через сколько секунд взятая воркером и не завершённая задача возвращается в очередь.
+JOBS_LOCK_TIMEOUT = config("JOBS_LOCK_TIMEOUT", default=600, cast=int)
+
+# Метрики запросов к базе данных и времени ответа по представлениям.
+MONITORING_ENABLED = config("MONITORING_ENABLED", default=True, cast=bool)
+
+MONITORING_SLOW_REQUEST_MS = config("MONITORING_SLOW_REQUEST_MS", default=500, cast=int)
+
+# Сколько самых медленных SQL-запросов попадает в журнал медленного ответа.
+MONITORING_SLOW_QUERIES = config("MONITORING_SLOW_QUERIES", default=3, cast=int)
+
+# Как часто (в секундах) процесс сохраняет свои гистограммы в файл снимка.
+MONITORING_SNAPSHOT_INTERVAL = config("MONITORING_SNAPSHOT_INTERVAL", default=30, cast=int)
+
+# Снимки процессов, которые не обновлялись дольше этого времени, удаляются.
+MONITORING_SNAPSHOT_TIMEOUT = config("MONITORING_SNAPSHOT_TIMEOUT", default=86400, cast=int)
+
+# Каталог снимков, общий для всех процессов сервера и команды dump_metrics
+# (при нескольких серверах — общий том).
+MONITORING_SNAPSHOT_DIR = config(
+    "MONITORING_SNAPSHOT_DIR", default=str(Path(tempfile.gettempdir()) / "blogproject-metrics")
+)
+
+# Сколько последних постов хранится в ленте одного пользователя.
+FEED_MAX_LENGTH = config("FEED_MAX_LENGTH", default=500, cast=int)
+
+# Посты авторов с таким колличеством подписчиков не рассылаются по лентам,
+# а подмешиваются при чтении ленты. Когда автор опускается ниже порога после отписки,
+# его посты рассылаются задачей fan_out_author; после смены порога или правки
+# подписок в админ-панели ленты собираются заново командой rebuild_feeds.
+FEED_FANOUT_THRESHOLD = config("FEED_FANOUT_THRESHOLD", default=1000, cast=int)
+
+# Оценка популярности постов: веса likes и комментариев и время
+# (в часах), за которое вклад активности уменьшается в e раз.
+TRENDING_LIKE_WEIGHT = config("TRENDING_LIKE_WEIGHT", default=1.0, cast=float)
+
+TRENDING_COMMENT_WEIGHT = config("TRENDING_COMMENT_WEIGHT", default=2.0, cast=float)
+
+TRENDING_DECAY_HOURS = config("TRENDING_DECAY_HOURS", default=24.0, cast=float)
+
 CKEDITOR_CONFIGS = {
     "default": {
         "width": "form-control",
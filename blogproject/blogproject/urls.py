@@ -7,6 +7,7 @@ urlpatterns = [
     path("", include("blog.urls")),
     path("admin/", admin.site.urls),
     path("profile/", include("user_profile.urls")),
+    path("monitoring/", include("monitoring.urls")),
 ]
 
 if settings.DEBUG:
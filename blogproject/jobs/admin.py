@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+from .queue import requeue
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Регистрация в админ-панели :model:`jobs.Job`."""
+
+    list_display = ["name", "key", "status", "attempts", "run_at", "created_at"]
+    list_filter = ["status", "name"]
+    search_fields = ["key"]
+    readonly_fields = ("locked_at", "last_error", "created_at")
+    actions = ["retry"]
+
+    @admin.action(description="Повторить выбранные задачи")
+    def retry(self, request, queryset):
+        """Возвращает задачи с ошибкой в очередь с новым запасом попыток."""
+        for job in queryset.filter(status=Job.FAILED):
+            Job.objects.filter(pk=job.pk).update(attempts=0)
+            requeue(job, timezone.now())
@@ -0,0 +1,44 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim_jobs, recover_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Воркер очереди фоновых задач: выполняет задачи из таблицы jobs_job. "
+        "Можно запустить несколько воркеров параллельно."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10, help="Колличество задач, забираемых за раз.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Пауза в секундах, когда очередь пуста.")
+        parser.add_argument("--once", action="store_true", help="Выполнить готовые задачи и завершиться.")
+
+    def handle(self, *args, **options):
+        """Забирает и выполняет готовые задачи, пока не получит SIGTERM или SIGINT."""
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        done = failed = 0
+        while not self.stopping:
+            close_old_connections()
+            recover_stale_jobs()
+            jobs = claim_jobs(options["batch_size"])
+            for job in jobs:
+                if run_job(job):
+                    done += 1
+                else:
+                    failed += 1
+            if not jobs:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Выполнено задач: {done}, с ошибкой: {failed}."))
+
+    def stop(self, signum, frame):
+        """Завершает работу после текущей пачки задач."""
+        self.stopping = True
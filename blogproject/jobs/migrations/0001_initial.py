@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-18 15:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=200, verbose_name="Задача")),
+                ("args", models.JSONField(blank=True, default=list, verbose_name="Аргументы")),
+                ("key", models.CharField(blank=True, max_length=200, null=True, verbose_name="Ключ идемпотентности")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("queued", "В очереди"), ("running", "Выполняется"), ("failed", "Ошибка")],
+                        default="queued",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="Колличество попыток")),
+                ("max_attempts", models.PositiveSmallIntegerField(default=5, verbose_name="Максимум попыток")),
+                (
+                    "run_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Выполнить не раньше"),
+                ),
+                ("locked_at", models.DateTimeField(blank=True, null=True, verbose_name="Взята в работу")),
+                ("last_error", models.TextField(blank=True, verbose_name="Последняя ошибка")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Дата добавления")),
+            ],
+            options={
+                "verbose_name": "Задача",
+                "verbose_name_plural": "Задачи",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("status", "queued")), fields=["run_at", "id"], name="jobs_job_queued_run_at_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="job",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "queued")), fields=("key",), name="jobs_job_queued_key_uniq"
+            ),
+        ),
+    ]
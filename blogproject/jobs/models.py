@@ -0,0 +1,45 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Фоновая задача: зарегистрированная функция (см. ``jobs/queue.py``)
+    и её аргументы. Выполняется командой run_jobs.
+
+    Выполненные задачи удаляются, в таблице остаются
+    ожидающие, выполняемые и исчерпавшие попытки.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "В очереди"), (RUNNING, "Выполняется"), (FAILED, "Ошибка")]
+
+    name = models.CharField(verbose_name="Задача", max_length=200)
+    args = models.JSONField(verbose_name="Аргументы", default=list, blank=True)
+    # Задачи с одинаковым ключом, ожидающие в очереди, не дублируются.
+    key = models.CharField(verbose_name="Ключ идемпотентности", max_length=200, null=True, blank=True)
+    status = models.CharField(verbose_name="Статус", max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(verbose_name="Колличество попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField(verbose_name="Максимум попыток", default=5)
+    run_at = models.DateTimeField(verbose_name="Выполнить не раньше", default=timezone.now)
+    locked_at = models.DateTimeField(verbose_name="Взята в работу", null=True, blank=True)
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    created_at = models.DateTimeField(verbose_name="Дата добавления", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        constraints = [
+            models.UniqueConstraint(fields=["key"], condition=Q(status="queued"), name="jobs_job_queued_key_uniq"),
+        ]
+        indexes = [
+            # Очередь выборки воркером: только ожидающие задачи.
+            models.Index(fields=["run_at", "id"], condition=Q(status="queued"), name="jobs_job_queued_run_at_idx"),
+        ]
+
+    def __str__(self):
+        """Возвращает строку в виде имени задачи и ключа."""
+        return f"{self.name} ({self.key})" if self.key else self.name
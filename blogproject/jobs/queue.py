@@ -0,0 +1,160 @@
+"""
+Очередь фоновых задач в таблице :model:`jobs.Job`.
+
+Задача добавляется в той же транзакции, что и изменения, которые её вызвали,
+поэтому она появляется в очереди, только если транзакция зафиксирована,
+а ответ на запрос не ждёт её выполнения. Выполняет задачи команда run_jobs.
+"""
+
+import logging
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def job_name(func):
+    return f"{func.__module__}.{func.__name__}"
+
+
+def job(func):
+    """
+    Регистрирует функцию как задачу очереди.
+
+    Аргументы задачи хранятся в JSON, поэтому функция принимает
+    идентификаторы объектов, а не сами объекты, и безопасна
+    для повторного выполнения.
+    """
+    _registry[job_name(func)] = func
+    return func
+
+
+def enqueue(func, *args, key=None, delay=None, max_attempts=None):
+    """
+    Ставит задачу `func(*args)` в очередь.
+
+    Если в очереди уже ждёт задача с тем же ключом `key`, новая не добавляется:
+    задача читает текущее состояние объекта, поэтому одного выполнения достаточно.
+    При ``JOBS_EAGER`` задача выполняется в процессе сразу после фиксации транзакции.
+    """
+    name = job_name(func)
+    if _registry.get(name) is not func:
+        raise ValueError(f"Функция {name} не зарегистрирована как задача (см. @job).")
+    if settings.JOBS_EAGER:
+        transaction.on_commit(partial(func, *args), robust=True)
+        return
+    run_at = timezone.now() + (delay or timedelta())
+    Job.objects.bulk_create(
+        [
+            Job(
+                name=name,
+                args=list(args),
+                key=key,
+                run_at=run_at,
+                max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            )
+        ],
+        ignore_conflicts=key is not None,
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед попыткой после `attempts` неудачных."""
+    return timedelta(seconds=min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOBS_RETRY_BACKOFF_MAX))
+
+
+def requeue(job, run_at):
+    """
+    Возвращает задачу в очередь.
+
+    Если задача с тем же ключом уже ждёт в очереди, эта удаляется:
+    ожидающая выполнит ту же работу.
+    """
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(status=Job.QUEUED, run_at=run_at, locked_at=None)
+    except IntegrityError:
+        Job.objects.filter(pk=job.pk).delete()
+
+
+def fail(job, error):
+    """Откладывает повтор задачи с экспоненциальной задержкой или отмечает её ошибкой."""
+    Job.objects.filter(pk=job.pk).update(last_error=error)
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, locked_at=None)
+    else:
+        requeue(job, timezone.now() + retry_delay(job.attempts))
+
+
+def claim_jobs(limit):
+    """
+    Забирает до `limit` готовых к выполнению задач.
+
+    Строки, заблокированные другими воркерами, пропускаются (SKIP LOCKED),
+    поэтому воркеры не ждут друг друга и не берут одну задачу дважды.
+    """
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=Now())
+            .order_by("run_at", "id")[:limit]
+        )
+        if jobs:
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=Job.RUNNING, attempts=F("attempts") + 1, locked_at=Now()
+            )
+    for job in jobs:
+        job.status = Job.RUNNING
+        job.attempts += 1
+    return jobs
+
+
+def run_job(job):
+    """
+    Выполняет задачу и удаляет её, а при ошибке планирует повтор.
+
+    Returns:
+        bool: True, если задача выполнена.
+    """
+    func = _registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"Задача {job.name} не зарегистрирована.")
+        func(*job.args)
+    except Exception as error:
+        logger.exception("Задача %s (попытка %s) завершилась ошибкой", job, job.attempts)
+        fail(job, f"{type(error).__name__}: {error}")
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def recover_stale_jobs():
+    """
+    Возвращает в очередь задачи, которые воркер взял больше ``JOBS_LOCK_TIMEOUT``
+    секунд назад и не завершил (например, процесс был остановлен).
+
+    Строки блокируются, как в :func:`claim_jobs`: заблокированные другим
+    процессом пропускаются, а воркер, завершающий задачу, ждёт конца транзакции.
+
+    Returns:
+        Колличество найденных задач.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    with transaction.atomic():
+        stale = list(
+            Job.objects.select_for_update(skip_locked=True).filter(status=Job.RUNNING, locked_at__lt=deadline)
+        )
+        for job in stale:
+            fail(job, "Воркер не завершил задачу.")
+    return len(stale)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "monitoring"
+
+    def ready(self):
+        from .middleware import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid="monitoring_query_recorder")
@@ -0,0 +1,64 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.management.base import CommandError
+from django.db.models import F
+
+from blog.autocomplete import normalize_prefix, similar_by_words
+from blog.cache import LATEST_COMMENTS_LIMIT
+from blog.models import Category, Comment, FeedEntry, Post
+from blog.search import SEARCH_CONFIG
+from user_profile.models import Profile
+
+# Размер страницы списков с запасом на признак следующей страницы.
+PAGE = 11
+
+
+def build_hot_queries(user=None):
+    """
+    Каталог частых запросов проекта с аргументами существующих объектов.
+
+    Returns:
+        Словарь имя → (QuerySet, допустимые узлы плана). Сортировка допустима,
+        например, для поиска, где порядок по релевантности не берётся из индекса,
+        а последовательное чтение — для маленьких справочных таблиц.
+    """
+    posts = Post.objects.order_by("-post_date", "-id")
+    post = (user and posts.filter(author=user).first()) or posts.order_by("-comments_amount", "-id").first()
+    if post is None:
+        raise CommandError("Нет постов: сначала выполните seed_data.")
+    user = user or post.author
+    category = Category.objects.order_by("-post_amount", "pk").first()
+    profile = Profile.objects.get(user=user)
+    word = post.title.split()[0]
+    prefix = normalize_prefix(word[:4])
+    search_query = SearchQuery(word, config=SEARCH_CONFIG, search_type="websearch")
+
+    return {
+        "home": (Post.objects.for_list().order_by("-post_date", "-id")[:PAGE], ()),
+        "trending": (Post.objects.for_list().order_by("-trending_score", "-id")[:PAGE], ()),
+        "category_posts": (
+            Post.objects.for_list().filter(category_id=category.pk).order_by("-post_date", "-id")[:PAGE],
+            (),
+        ),
+        "author_posts": (Post.objects.for_list().filter(author=user).order_by("-post_date", "-id")[:PAGE], ()),
+        "post_detail": (
+            Post.objects.filter(slug=post.slug).with_liked_by(user).select_related("author", "category"),
+            (),
+        ),
+        "post_like": (Post.likes.through.objects.filter(post_id=post.pk, user_id=user.pk), ()),
+        "post_comments": (Comment.objects.filter(post=post).order_by("pub_date", "id")[:21], ()),
+        "latest_comments": (Comment.objects.order_by("-pub_date", "-id")[:LATEST_COMMENTS_LIMIT], ()),
+        "category_list": (Category.objects.order_by("-post_amount", "pk")[:6], ("Seq Scan", "Sort")),
+        "feed": (FeedEntry.objects.filter(user=user).order_by("-post_date", "-post")[:PAGE], ()),
+        "followers": (Profile.objects.filter(followed_by=profile).order_by("-id")[:31], ("Sort",)),
+        "profile": (Profile.objects.select_related("user").with_followed_by(user).filter(slug=profile.slug), ()),
+        # Сортировка по похожести не берётся из индекса, но выполняется только над совпадениями.
+        "autocomplete_posts": (similar_by_words(Post.objects.all(), "title", prefix, PAGE), ("Sort",)),
+        "autocomplete_categories": (similar_by_words(Category.objects.all(), "name", prefix, PAGE), ("Sort",)),
+        "search": (
+            Post.objects.for_list()
+            .filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-post_date")[:PAGE],
+            ("Sort",),
+        ),
+    }
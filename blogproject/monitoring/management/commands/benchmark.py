@@ -0,0 +1,183 @@
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from monitoring.routes import CLIENT_ADDRESS, build_routes
+
+
+class Command(BaseCommand):
+    help = (
+        "Обходит маршруты blog и profile тестовым клиентом или запросами к локальному серверу, "
+        "выводит p50/p95/p99 времени ответа и колличество SQL-запросов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20, help="Колличество измерений на маршрут.")
+        parser.add_argument("--warmup", type=int, default=2, help="Колличество прогревочных запросов на маршрут.")
+        parser.add_argument("--username", help="Выполнять запросы от имени этого пользователя.")
+        parser.add_argument("--host", default="localhost", help="Заголовок Host для тестового клиента.")
+        parser.add_argument(
+            "--base-url", help="Адрес запущенного сервера, например http://127.0.0.1:8000 (без подсчёта SQL)."
+        )
+        parser.add_argument("--routes", nargs="*", help="Имена маршрутов, например blog:home profile:login.")
+        parser.add_argument("--output", help="Сохранить результаты в JSON-файл базовой линии.")
+        parser.add_argument("--compare", help="Сравнить результаты с JSON-файлом базовой линии.")
+        parser.add_argument(
+            "--threshold", type=float, default=10.0, help="Рост p95 в процентах, считающийся регрессией."
+        )
+
+    def handle(self, *args, **options):
+        """Измеряет маршруты и сохраняет или сравнивает базовую линию."""
+        if options["requests"] < 2:
+            raise CommandError("Для перцентилей нужно хотя бы два измерения на маршрут.")
+        user = None
+        if options["username"]:
+            user = User.objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"Пользователь «{options['username']}» не найден.")
+        if options["base_url"]:
+            self.send = self.remote_sender(options["base_url"].rstrip("/"))
+        else:
+            self.send = self.client_sender(user, options["host"])
+
+        routes = build_routes(user)
+        if options["routes"]:
+            routes = {name: route for name, route in routes.items() if name in options["routes"]}
+        results = {}
+        for name, (method, url, data) in routes.items():
+            results[name] = self.measure(method, url, data, options["requests"], options["warmup"])
+            self.write_result(name, results[name])
+
+        report = {
+            "created": timezone.now().isoformat(),
+            "commit": self.current_commit(),
+            "username": options["username"],
+            "requests": options["requests"],
+            "routes": results,
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Базовая линия сохранена в {options['output']}."))
+        if options["compare"]:
+            self.compare(json.loads(Path(options["compare"]).read_text()), report, options["threshold"])
+
+    def client_sender(self, user, host):
+        # Ошибка представления записывается как ответ 500, а не прерывает весь обход.
+        client = Client(HTTP_HOST=host, REMOTE_ADDR=CLIENT_ADDRESS, raise_request_exception=False)
+        if user is not None:
+            client.force_login(user)
+
+        def send(method, url, data):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                if method == "POST":
+                    response = client.post(url, data)
+                else:
+                    response = client.get(url, data)
+                elapsed = time.perf_counter() - start
+            return response.status_code, elapsed, len(queries)
+
+        return send
+
+    def remote_sender(self, base_url):
+        def send(method, url, data):
+            query = urlencode(data)
+            if method == "POST":
+                request = Request(base_url + url, data=query.encode(), method=method)
+            else:
+                request = Request(f"{base_url}{url}?{query}" if query else base_url + url, method=method)
+            start = time.perf_counter()
+            try:
+                with urlopen(request) as response:
+                    response.read()
+                    status = response.status
+            except HTTPError as error:
+                status = error.code
+            return status, time.perf_counter() - start, None
+
+        return send
+
+    def measure(self, method, url, data, requests, warmup):
+        """
+        Выполняет прогревочные и измеряемые запросы к одному маршруту.
+
+        Returns:
+            Перцентили времени ответа в миллисекундах и колличество SQL-запросов.
+        """
+        if method == "POST":
+            # Чётное число вызовов переключателя возвращает данные в исходное состояние.
+            requests += requests % 2
+            warmup += warmup % 2
+        for _ in range(warmup):
+            self.send(method, url, data)
+        timings, query_counts, statuses = [], [], set()
+        for _ in range(requests):
+            status, elapsed, queries = self.send(method, url, data)
+            statuses.add(status)
+            timings.append(elapsed * 1000)
+            if queries is not None:
+                query_counts.append(queries)
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        return {
+            "method": method,
+            "url": url,
+            "status": sorted(statuses),
+            "p50": round(cuts[49], 2),
+            "p95": round(cuts[94], 2),
+            "p99": round(cuts[98], 2),
+            "mean": round(statistics.fmean(timings), 2),
+            "queries": max(query_counts) if query_counts else None,
+        }
+
+    def write_result(self, name, result):
+        self.stdout.write(
+            f"{name:<28} {result['method']:<4} {','.join(map(str, result['status'])):<8} "
+            f"p50 {result['p50']:>8} ms  p95 {result['p95']:>8} ms  p99 {result['p99']:>8} ms  "
+            f"SQL {result['queries'] if result['queries'] is not None else '-'}"
+        )
+
+    def compare(self, baseline, report, threshold):
+        """Выводит изменение p95 и колличества SQL-запросов относительно базовой линии."""
+        self.stdout.write(f"Сравнение с базовой линией {baseline.get('commit') or ''} ({baseline.get('created')}):")
+        regressions = 0
+        for name, result in report["routes"].items():
+            before = baseline["routes"].get(name)
+            if before is None:
+                self.stdout.write(f"{name:<28} нет в базовой линии")
+                continue
+            change = (result["p95"] - before["p95"]) / before["p95"] * 100 if before["p95"] else 0
+            line = (
+                f"{name:<28} p95 {before['p95']:>8} → {result['p95']:>8} ms ({change:+.1f}%)  "
+                f"SQL {before['queries']} → {result['queries']}"
+            )
+            more_queries = (result["queries"] or 0) > (before["queries"] or 0)
+            if change > threshold or more_queries:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            self.stdout.write(self.style.WARNING(f"Регрессий: {regressions}."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Регрессий нет."))
+
+    def current_commit(self):
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout.strip()
@@ -0,0 +1,131 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+
+from monitoring.routes import CLIENT_ADDRESS, build_routes
+
+# Маршруты чтения, для которых есть async-варианты представлений.
+READ_ROUTES = ("blog:home", "blog:post_detail", "blog:category_list", "blog:search", "profile:profile_detail")
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность маршрутов чтения через WSGI- и ASGI-обработчик "
+        "при одинаковом колличестве одновременных исполнителей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Колличество одновременных исполнителей.")
+        parser.add_argument("--requests", type=int, default=200, help="Колличество запросов на маршрут.")
+        parser.add_argument("--username", help="Выполнять запросы от имени этого пользователя.")
+        parser.add_argument("--host", default="localhost", help="Заголовок Host тестового клиента.")
+        parser.add_argument("--routes", nargs="*", default=READ_ROUTES, help="Имена маршрутов.")
+        parser.add_argument(
+            "--handler", choices=("wsgi", "asgi", "both"), default="both", help="Какой обработчик измерять."
+        )
+
+    def handle(self, *args, **options):
+        """Измеряет маршруты обоими обработчиками и выводит req/s, p50 и p95."""
+        if options["workers"] < 1 or options["requests"] < options["workers"]:
+            raise CommandError("Нужен хотя бы один исполнитель и не меньше одного запроса на исполнителя.")
+        self.user = None
+        if options["username"]:
+            self.user = User.objects.filter(username=options["username"]).first()
+            if self.user is None:
+                raise CommandError(f"Пользователь «{options['username']}» не найден.")
+        self.host = options["host"]
+        routes = build_routes(self.user)
+        unknown = set(options["routes"]) - routes.keys()
+        if unknown:
+            raise CommandError(f"Неизвестные маршруты: {', '.join(sorted(unknown))}.")
+        if self.user is None and "blog:search" in options["routes"]:
+            self.stdout.write(self.style.WARNING("Поиск без --username вернёт перенаправление на вход."))
+
+        mode = "async" if settings.ASYNC_READ_VIEWS else "sync"
+        self.stdout.write(f"Представления чтения: {mode} (ASYNC_READ_VIEWS), исполнителей: {options['workers']}")
+        handlers = ("wsgi", "asgi") if options["handler"] == "both" else (options["handler"],)
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name in options["routes"]:
+                method, url, data = routes[name]
+                for handler in handlers:
+                    measure = self.measure_wsgi if handler == "wsgi" else self.measure_asgi
+                    # Прогрев: шаблоны, кеши и соединения.
+                    measure(url, data, options["workers"], options["workers"])
+                    elapsed, timings, statuses = measure(url, data, options["requests"], options["workers"])
+                    self.write_result(name, handler, elapsed, timings, statuses)
+
+    def client(self, client_class):
+        if client_class is AsyncClient:
+            # Адрес async-клиента задаётся в ASGI scope, а заголовок Host всегда «testserver».
+            client = AsyncClient(client=[CLIENT_ADDRESS, 0])
+        else:
+            client = Client(HTTP_HOST=self.host, REMOTE_ADDR=CLIENT_ADDRESS)
+        if self.user is not None:
+            client.force_login(self.user)
+        return client
+
+    def measure_wsgi(self, url, data, requests, workers):
+        """Синхронный обработчик: по тестовому клиенту на поток, как у WSGI-сервера с потоками."""
+
+        def worker(amount):
+            client = self.client(Client)
+            results = []
+            try:
+                for _ in range(amount):
+                    start = time.perf_counter()
+                    response = client.get(url, data)
+                    results.append((time.perf_counter() - start, response.status_code))
+            finally:
+                connections.close_all()
+            return results
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(worker, self.split(requests, workers)))
+        return self.collect(time.perf_counter() - start, chunks)
+
+    def measure_asgi(self, url, data, requests, workers):
+        """Асинхронный обработчик: задачи в одном цикле событий, как у ASGI-сервера."""
+        clients = [self.client(AsyncClient) for _ in range(workers)]
+
+        async def worker(client, amount):
+            results = []
+            for _ in range(amount):
+                start = time.perf_counter()
+                response = await client.get(url, data)
+                results.append((time.perf_counter() - start, response.status_code))
+            return results
+
+        async def run():
+            return await asyncio.gather(
+                *(worker(client, amount) for client, amount in zip(clients, self.split(requests, workers)))
+            )
+
+        start = time.perf_counter()
+        chunks = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        connections.close_all()
+        return self.collect(elapsed, chunks)
+
+    def split(self, requests, workers):
+        """Распределяет запросы между исполнителями поровну."""
+        return [requests // workers + (index < requests % workers) for index in range(workers)]
+
+    def collect(self, elapsed, chunks):
+        timings = [duration * 1000 for chunk in chunks for duration, _ in chunk]
+        statuses = {status for chunk in chunks for _, status in chunk}
+        return elapsed, timings, statuses
+
+    def write_result(self, name, handler, elapsed, timings, statuses):
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        self.stdout.write(
+            f"{name:<24} {handler:<4} {','.join(map(str, sorted(statuses))):<8} "
+            f"{len(timings) / elapsed:>8.1f} req/s  p50 {cuts[49]:>8.2f} ms  p95 {cuts[94]:>8.2f} ms"
+        )
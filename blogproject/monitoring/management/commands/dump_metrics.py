@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from monitoring import metrics
+
+
+class Command(BaseCommand):
+    help = "Выводит гистограммы времени ответа и запросов к базе данных по представлениям."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Вывести сводку в формате JSON.")
+        parser.add_argument("--reset", action="store_true", help="Очистить гистограммы после вывода.")
+
+    def handle(self, *args, **options):
+        """Выводит сводку по снимкам гистограмм всех процессов (``MONITORING_SNAPSHOT_DIR``)."""
+        summary = metrics.summarize(metrics.collect())
+        pools = metrics.collect_pools()
+        if options["json"]:
+            if pools:
+                summary["<pools>"] = pools
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2))
+        else:
+            for view_name, values in summary.items():
+                self.stdout.write(f"{view_name} (запросов: {values['total_ms']['count']})")
+                for metric, stats in values.items():
+                    self.stdout.write(
+                        f"  {metric}: avg {stats['avg']}, p50 {stats['p50']}, p95 {stats['p95']}, "
+                        f"p99 {stats['p99']}, max {stats['max']}"
+                    )
+            for alias, stats in pools.items():
+                self.stdout.write(
+                    f"Пул {alias}: занято {stats['in_use']} из {stats['size']} (max {stats['max_size']}), "
+                    f"ожидают {stats['waiting']}, ожидание {stats['wait_ms']} ms, таймауты {stats['timeouts']}"
+                )
+        if options["reset"]:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Гистограммы очищены."))
@@ -0,0 +1,110 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from monitoring.hot_queries import build_hot_queries
+
+# Узлы плана, которые означают, что подходящего индекса нет.
+SORT_NODES = {"Sort", "Incremental Sort"}
+
+# Узел отбрасывает фильтром во столько раз больше строк, чем возвращает:
+# индекс выбран ради порядка, а условие по нему не проверяется.
+FILTER_RATIO = 10
+
+# Меньшие объёмы отброшенных строк не отмечаются.
+FILTER_MIN_ROWS = 100
+
+
+def plan_issues(node, allowed):
+    """
+    Последовательные чтения, сортировки и чтения с отбрасыванием
+    большинства строк фильтром во всех узлах плана, кроме разрешённых.
+    """
+    issues = []
+    node_type = node["Node Type"]
+    removed = node.get("Rows Removed by Filter", 0)
+    if node_type == "Seq Scan" and node_type not in allowed:
+        issues.append(f"Seq Scan on {node['Relation Name']}")
+    elif node_type in SORT_NODES and "Sort" not in allowed:
+        issues.append(f"{node_type} by {', '.join(node.get('Sort Key', []))}")
+    elif removed > max(FILTER_MIN_ROWS, node.get("Actual Rows", 0) * FILTER_RATIO):
+        issues.append(f"{node_type} on {node.get('Relation Name', '?')} removed {removed} rows by filter")
+    for child in node.get("Plans", []):
+        issues.extend(plan_issues(child, allowed))
+    return issues
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет EXPLAIN (ANALYZE, BUFFERS) для частых запросов проекта на заполненной базе "
+        "(см. seed_data) и отмечает последовательные чтения таблиц и сортировки без индекса."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Подставлять в запросы этого пользователя.")
+        parser.add_argument("--queries", nargs="*", help="Имена запросов из каталога (по умолчанию все).")
+        parser.add_argument(
+            "--planner-defaults",
+            action="store_true",
+            help="Не запрещать планировщику Seq Scan и Sort: на маленькой базе они дешевле любого индекса.",
+        )
+        parser.add_argument("--json", action="store_true", help="Вывести планы и замечания в формате JSON.")
+        parser.add_argument("--strict", action="store_true", help="Завершиться с ошибкой, если есть замечания.")
+
+    def handle(self, *args, **options):
+        """Выводит время, чтение буферов и замечания по плану каждого запроса."""
+        user = None
+        if options["username"]:
+            user = User.objects.filter(username=options["username"]).first()
+            if user is None:
+                raise CommandError(f"Пользователь «{options['username']}» не найден.")
+        queries = build_hot_queries(user)
+        names = options["queries"] or list(queries)
+        unknown = set(names) - queries.keys()
+        if unknown:
+            raise CommandError(f"Неизвестные запросы: {', '.join(sorted(unknown))}.")
+
+        report = {}
+        for name in names:
+            queryset, allowed = queries[name]
+            plan = self.explain(queryset, options["planner_defaults"])
+            root = plan["Plan"]
+            report[name] = {
+                "execution_ms": plan["Execution Time"],
+                "shared_hit": root.get("Shared Hit Blocks", 0),
+                "shared_read": root.get("Shared Read Blocks", 0),
+                "issues": plan_issues(root, allowed),
+                "plan": plan,
+            }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            for name, row in report.items():
+                status = self.style.WARNING("; ".join(row["issues"])) if row["issues"] else self.style.SUCCESS("OK")
+                self.stdout.write(
+                    f"{name:<16} {row['execution_ms']:>9.3f} ms  "
+                    f"буферы hit {row['shared_hit']:>6} read {row['shared_read']:>6}  {status}"
+                )
+        flagged = [name for name, row in report.items() if row["issues"]]
+        if flagged and options["strict"]:
+            raise CommandError(f"Запросы без подходящих индексов: {', '.join(flagged)}.")
+
+    def explain(self, queryset, planner_defaults):
+        """План запроса `queryset` с фактическим временем и чтением буферов."""
+        sql, params = queryset.query.sql_with_params()
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN (ANALYZE, BUFFERS) доступен только для PostgreSQL.")
+        with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+            if not planner_defaults:
+                # Seq Scan и Sort остаются в плане, только если подходящего индекса нет совсем.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+            result = cursor.fetchone()[0]
+        if isinstance(result, str):
+            result = json.loads(result)
+        return result[0]
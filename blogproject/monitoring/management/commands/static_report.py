@@ -0,0 +1,60 @@
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.staticfiles import ENCODINGS, brotli
+
+
+class Command(BaseCommand):
+    help = "Показывает, сколько байт экономят сжатые копии статических файлов из collectstatic."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Вывести сводку в формате JSON.")
+
+    def handle(self, *args, **options):
+        """Суммирует размеры файлов ``STATIC_ROOT`` и их копий gzip и brotli по расширениям."""
+        root = Path(settings.STATIC_ROOT)
+        if not root.is_dir():
+            raise CommandError(f"{root} не найден: сначала выполните collectstatic.")
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        # Имя с хешем → исходное имя: расширение берётся из исходного (``LICENSE.ec39d75cbc4d`` → ``LICENSE``).
+        originals = {hashed: name for name, hashed in getattr(staticfiles_storage, "hashed_files", {}).items()}
+        totals = defaultdict(lambda: {"files": 0, "hashed": 0, "bytes": 0, "gzip": 0, "br": 0})
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(suffixes):
+                    continue
+                path = Path(directory, filename)
+                size = path.stat().st_size
+                name = path.relative_to(root).as_posix()
+                row = totals[Path(originals.get(name, name)).suffix.lower() or "<без расширения>"]
+                row["files"] += 1
+                row["hashed"] += name in originals
+                row["bytes"] += size
+                # Без сжатой копии клиент получает файл целиком.
+                for encoding, suffix in ENCODINGS:
+                    variant = path.with_name(filename + suffix)
+                    row[encoding] += variant.stat().st_size if variant.exists() else size
+        summary = dict(sorted(totals.items(), key=lambda item: -item[1]["bytes"]))
+        total = {key: sum(row[key] for row in summary.values()) for key in ("files", "hashed", "bytes", "gzip", "br")}
+
+        if options["json"]:
+            self.stdout.write(json.dumps({**summary, "<total>": total}, ensure_ascii=False, indent=2))
+            return
+        for extension, row in {**summary, "Всего": total}.items():
+            self.stdout.write(
+                f"{extension:<16} файлов {row['files']:>5} (с хешем {row['hashed']:>5})  "
+                f"{row['bytes']:>10} байт  gzip {row['gzip']:>10}  br {row['br']:>10}"
+            )
+        for encoding in ("gzip", "br"):
+            if encoding == "br" and brotli is None:
+                self.stdout.write("br: пакет brotli не установлен, копии .br не создаются.")
+                continue
+            saved = total["bytes"] - total[encoding]
+            percent = saved * 100 / total["bytes"] if total["bytes"] else 0
+            self.stdout.write(f"{encoding}: сэкономлено {saved} байт ({percent:.1f}%)")
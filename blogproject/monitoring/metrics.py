@@ -0,0 +1,195 @@
+import bisect
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+# Верхние границы корзин гистограмм; последняя корзина — всё, что больше.
+BUCKETS = {
+    "queries": (0, 1, 2, 5, 10, 20, 50, 100, 200),
+    "db_ms": (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    "render_ms": (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    "total_ms": (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+}
+
+_lock = threading.Lock()
+_views = {}
+_last_snapshot = 0.0
+
+
+def _empty_histogram(metric):
+    return {"count": 0, "sum": 0, "max": 0, "buckets": [0] * (len(BUCKETS[metric]) + 1)}
+
+
+def record(view_name, values):
+    """
+    Добавляет измерения запроса `values` ({метрика: значение})
+    в гистограммы представления `view_name`.
+    """
+    with _lock:
+        histograms = _views.setdefault(view_name, {metric: _empty_histogram(metric) for metric in BUCKETS})
+        for metric, value in values.items():
+            histogram = histograms[metric]
+            histogram["count"] += 1
+            histogram["sum"] += value
+            histogram["max"] = max(histogram["max"], value)
+            histogram["buckets"][bisect.bisect_left(BUCKETS[metric], value)] += 1
+    _maybe_snapshot()
+
+
+def local_metrics():
+    """Копия гистограмм текущего процесса."""
+    with _lock:
+        return {
+            view_name: {metric: {**h, "buckets": list(h["buckets"])} for metric, h in histograms.items()}
+            for view_name, histograms in _views.items()
+        }
+
+
+def reset():
+    """Очищает гистограммы текущего процесса и снимки всех процессов."""
+    with _lock:
+        _views.clear()
+    for path in Path(settings.MONITORING_SNAPSHOT_DIR).glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+def _snapshot_path():
+    # Имя узла различает процессы с одинаковым pid на разных серверах с общим каталогом.
+    return Path(settings.MONITORING_SNAPSHOT_DIR, f"{socket.gethostname()}-{os.getpid()}.json")
+
+
+def local_pool_stats():
+    """Статистика пулов соединений текущего процесса по псевдонимам баз данных."""
+    stats = {}
+    for connection in connections.all():
+        pool_stats = getattr(connection, "pool_stats", None)
+        values = pool_stats() if pool_stats else None
+        if values is not None:
+            stats[connection.alias] = values
+    return stats
+
+
+def snapshot():
+    """
+    Сохраняет гистограммы и статистику пулов процесса в файл ``MONITORING_SNAPSHOT_DIR``,
+    чтобы их могли прочитать другие процессы (команда dump_metrics).
+
+    Файл заменяется целиком, поэтому читатели не видят его частично записанным.
+    """
+    global _last_snapshot
+    _last_snapshot = time.monotonic()
+    path = _snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = json.dumps({"views": local_metrics(), "pools": local_pool_stats()})
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as file:
+        file.write(data)
+    os.replace(file.name, path)
+
+
+def _other_snapshots():
+    """
+    Последние снимки остальных процессов.
+
+    Снимки старше ``MONITORING_SNAPSHOT_TIMEOUT`` остались от завершённых процессов и удаляются.
+    """
+    own = _snapshot_path()
+    deadline = time.time() - settings.MONITORING_SNAPSHOT_TIMEOUT
+    snapshots = []
+    for path in Path(settings.MONITORING_SNAPSHOT_DIR).glob("*.json"):
+        if path == own:
+            continue
+        try:
+            if path.stat().st_mtime < deadline:
+                path.unlink(missing_ok=True)
+                continue
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _maybe_snapshot():
+    if time.monotonic() - _last_snapshot >= settings.MONITORING_SNAPSHOT_INTERVAL:
+        snapshot()
+
+
+def merge(*snapshots):
+    """Складывает гистограммы нескольких процессов."""
+    merged = {}
+    for views in snapshots:
+        for view_name, histograms in views.items():
+            target = merged.setdefault(view_name, {metric: _empty_histogram(metric) for metric in BUCKETS})
+            for metric, histogram in histograms.items():
+                total = target[metric]
+                total["count"] += histogram["count"]
+                total["sum"] += histogram["sum"]
+                total["max"] = max(total["max"], histogram["max"])
+                total["buckets"] = [a + b for a, b in zip(total["buckets"], histogram["buckets"])]
+    return merged
+
+
+def collect():
+    """
+    Гистограммы всех процессов: текущего — из памяти,
+    остальных — из их последних снимков.
+    """
+    return merge(local_metrics(), *(snapshot["views"] for snapshot in _other_snapshots()))
+
+
+def collect_pools():
+    """
+    Статистика пулов соединений, сложенная по процессам:
+    текущего — из пулов, остальных — из их последних снимков.
+    """
+    merged = {}
+    for stats in [local_pool_stats(), *(snapshot["pools"] for snapshot in _other_snapshots())]:
+        for alias, values in stats.items():
+            target = merged.setdefault(alias, dict.fromkeys(values, 0))
+            for name, value in values.items():
+                target[name] += value
+    return merged
+
+
+def percentile(metric, histogram, fraction):
+    """
+    Оценка перцентиля по верхней границе корзины гистограммы,
+    но не больше наибольшего измерения.
+    """
+    if not histogram["count"]:
+        return 0
+    rank = fraction * histogram["count"]
+    seen = 0
+    for index, amount in enumerate(histogram["buckets"]):
+        seen += amount
+        if seen >= rank:
+            bounds = BUCKETS[metric]
+            return round(min(bounds[index], histogram["max"]) if index < len(bounds) else histogram["max"], 2)
+    return round(histogram["max"], 2)
+
+
+def summarize(views):
+    """
+    Сводка по представлениям: колличество запросов,
+    среднее, p50, p95, p99 и максимум каждой метрики.
+    """
+    summary = {}
+    for view_name, histograms in sorted(views.items()):
+        summary[view_name] = {
+            metric: {
+                "count": histogram["count"],
+                "avg": round(histogram["sum"] / histogram["count"], 2) if histogram["count"] else 0,
+                "p50": percentile(metric, histogram, 0.5),
+                "p95": percentile(metric, histogram, 0.95),
+                "p99": percentile(metric, histogram, 0.99),
+                "max": round(histogram["max"], 2),
+            }
+            for metric, histogram in histograms.items()
+        }
+    return summary
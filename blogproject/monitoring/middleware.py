@@ -0,0 +1,152 @@
+import heapq
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger("monitoring.slow_requests")
+
+# Счётчик запросов текущего ответа. Контекст копируется в потоки `sync_to_async`,
+# поэтому учитываются и запросы, выполненные параллельно в отдельных соединениях.
+current_recorder = ContextVar("current_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Постоянная обёртка выполнения SQL каждого соединения:
+    передаёт запрос счётчику текущего ответа, если он есть.
+    """
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Обработчик `connection_created`: подключает :func:`record_query` к новому соединению."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class QueryRecorder:
+    """
+    Обёртка выполнения SQL (``connection.execute_wrapper``):
+    считает запросы, их суммарное время
+    и хранит SQL нескольких самых медленных.
+    """
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                self.count += 1
+                self.duration += duration
+                if self.keep:
+                    entry = (duration, self.count, sql)
+                    if len(self.slowest) < self.keep:
+                        heapq.heappush(self.slowest, entry)
+                    else:
+                        heapq.heappushpop(self.slowest, entry)
+
+
+class RequestMetricsMiddleware:
+    """
+    Измеряет для каждого представления (по имени маршрута, например ``blog:home``)
+    колличество SQL-запросов, время базы данных, время отрисовки шаблона
+    и общее время ответа.
+
+    Время отрисовки включает запросы, выполненные из шаблона.
+    Медленные ответы (``MONITORING_SLOW_REQUEST_MS``) пишутся в журнал
+    ``monitoring.slow_requests`` вместе с SQL самых медленных запросов.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.MONITORING_ENABLED:
+            return self.get_response(request)
+        recorder, token, start = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.finish(request, recorder, start)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.MONITORING_ENABLED:
+            return await self.get_response(request)
+        recorder, token, start = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.finish(request, recorder, start)
+        return response
+
+    def start(self, request):
+        recorder = QueryRecorder(settings.MONITORING_SLOW_QUERIES)
+        request._metrics_render = 0.0
+        return recorder, current_recorder.set(recorder), time.perf_counter()
+
+    def finish(self, request, recorder, start):
+        total = time.perf_counter() - start
+        view_name = getattr(request.resolver_match, "view_name", None) or "<unresolved>"
+        values = {
+            "queries": recorder.count,
+            "db_ms": recorder.duration * 1000,
+            "render_ms": request._metrics_render * 1000,
+            "total_ms": total * 1000,
+        }
+        metrics.record(view_name, values)
+        if values["total_ms"] >= settings.MONITORING_SLOW_REQUEST_MS:
+            self.log_slow_request(request, view_name, values, recorder)
+
+    def process_template_response(self, request, response):
+        """Засекает время отрисовки шаблона ответа."""
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, view_name, values, recorder):
+        queries = "\n".join(
+            f"  {duration * 1000:.1f} ms: {sql}" for duration, _, sql in sorted(recorder.slowest, reverse=True)
+        )
+        logger.warning(
+            "Медленный ответ %s %s (%s): %.1f ms, запросов %d, база данных %.1f ms, шаблон %.1f ms\n%s",
+            request.method,
+            request.path,
+            view_name,
+            values["total_ms"],
+            values["queries"],
+            values["db_ms"],
+            values["render_ms"],
+            queries,
+        )
@@ -0,0 +1,73 @@
+from django.contrib.auth.mixins import AccessMixin
+from django.core.management.base import CommandError
+from django.urls import URLPattern, get_resolver, reverse
+
+from blog.models import Category, Comment, Post
+
+# Пространства имён маршрутов, которые обходят бенчмарки.
+NAMESPACES = ("blog", "profile")
+
+# Маршруты, которые нельзя вызывать в цикле, не ломая сессию клиента.
+SKIPPED_ROUTES = {"profile:logout"}
+
+# Маршруты только для вошедших пользователей, представления которых не проверяют вход
+# через AccessMixin: без пользователя бенчмарк их пропускает.
+LOGIN_REQUIRED_ROUTES = {"profile:update_profile", "profile:password_change"}
+
+# Маршруты-переключатели: вызываются методом POST чётное число раз,
+# чтобы данные вернулись в исходное состояние.
+TOGGLE_ROUTES = {"blog:like_post", "profile:follow_user"}
+
+# Адрес клиента вне INTERNAL_IPS, чтобы django-debug-toolbar не искажал измерения.
+CLIENT_ADDRESS = "192.0.2.1"
+
+
+def requires_login(name, pattern):
+    """Требует ли маршрут `name` вошедшего пользователя."""
+    view_class = getattr(pattern.callback, "view_class", None)
+    return name in LOGIN_REQUIRED_ROUTES or (view_class is not None and issubclass(view_class, AccessMixin))
+
+
+def build_routes(user):
+    """
+    Адреса всех маршрутов из ``NAMESPACES``
+    с аргументами существующих объектов.
+
+    Без пользователя `user` маршруты, требующие входа, пропускаются:
+    они измеряли бы только перенаправление на страницу входа.
+    """
+    posts = Post.objects.order_by("-post_date", "-id")
+    post = (user and posts.filter(author=user).first()) or posts.first()
+    if post is None:
+        raise CommandError("Нет постов: сначала выполните seed_data.")
+    comment = Comment.objects.filter(post=post).first() or Comment.objects.select_related("post").first()
+    category = Category.objects.order_by("-post_amount", "pk").first()
+    profile = (user or post.author).profile
+    arguments = {
+        "blog": lambda name: (
+            {"pk": comment.pk, "slug": comment.post.slug}
+            if name.startswith("comment_") and comment
+            else {"pk": category.pk, "slug": category.slug}
+            if name == "category_detail"
+            else {"slug": post.slug}
+        ),
+        "profile": lambda name: {"slug": profile.slug},
+    }
+    data = {"blog:like_post": {"post_slug": post.slug}, "blog:search": {"do": post.title.split()[0]}}
+
+    routes = {}
+    resolver = get_resolver()
+    for namespace in NAMESPACES:
+        _, namespace_resolver = resolver.namespace_dict[namespace]
+        for pattern in namespace_resolver.url_patterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = f"{namespace}:{pattern.name}"
+            if name in SKIPPED_ROUTES or user is None and requires_login(name, pattern):
+                continue
+            keys = pattern.pattern.converters.keys()
+            candidates = arguments[namespace](pattern.name)
+            url = reverse(name, kwargs={key: candidates[key] for key in keys})
+            method = "POST" if name in TOGGLE_ROUTES else "GET"
+            routes[name] = (method, url, data.get(name, {}))
+    return routes
@@ -0,0 +1,30 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.generic import View
+
+from . import metrics
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class MetricsView(View):
+    """
+    Сводка гистограмм времени ответа и запросов к базе данных
+    по представлениям в формате JSON. Доступна только персоналу.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(
+            metrics.summarize(metrics.collect()), json_dumps_params={"ensure_ascii": False, "indent": 2}
+        )
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class PoolStatsView(View):
+    """
+    Статистика пулов соединений с базами данных по всем процессам
+    в формате JSON. Доступна только персоналу.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(metrics.collect_pools(), json_dumps_params={"ensure_ascii": False, "indent": 2})
@@ -0,0 +1,79 @@
+// Подсказки поиска по мере ввода: заголовки постов и названия категорий.
+(function () {
+    var input = document.getElementById("search");
+    var menu = document.getElementById("search-suggestions");
+    if (!input || !menu) {
+        return;
+    }
+    var timer = null;
+    var controller = null;
+
+    function hide() {
+        menu.classList.remove("show");
+        menu.replaceChildren();
+    }
+
+    function addItems(header, items) {
+        if (!items.length) {
+            return;
+        }
+        var title = document.createElement("li");
+        title.innerHTML = '<h6 class="dropdown-header"></h6>';
+        title.firstChild.textContent = header;
+        menu.appendChild(title);
+        items.forEach(function (item) {
+            var li = document.createElement("li");
+            var link = document.createElement("a");
+            link.className = "dropdown-item text-truncate";
+            link.href = item.url;
+            link.textContent = item.title;
+            li.appendChild(link);
+            menu.appendChild(li);
+        });
+    }
+
+    function load() {
+        var query = input.value.trim();
+        if (query.length < 2) {
+            hide();
+            return;
+        }
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        var url = new URL(input.dataset.autocompleteUrl, window.location.href);
+        url.searchParams.set("q", query);
+        fetch(url, {headers: {"Accept": "application/json"}, signal: controller.signal})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.json();
+            })
+            .then(function (data) {
+                hide();
+                addItems("Посты", data.posts);
+                addItems("Категории", data.categories);
+                if (menu.children.length) {
+                    menu.classList.add("show");
+                }
+            })
+            .catch(function () {});
+    }
+
+    input.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(load, 200);
+    });
+    input.addEventListener("keydown", function (event) {
+        if (event.key === "Escape") {
+            hide();
+        }
+    });
+    document.addEventListener("click", function (event) {
+        if (!menu.contains(event.target) && event.target !== input) {
+            hide();
+        }
+    });
+})();
@@ -0,0 +1,25 @@
+// Подгрузка следующих порций комментариев без перезагрузки страницы.
+document.addEventListener("click", function (event) {
+    var link = event.target.closest("[data-more-comments]");
+    if (!link) {
+        return;
+    }
+    event.preventDefault();
+    link.classList.add("disabled");
+    var url = new URL(link.href, window.location.href);
+    url.searchParams.set("format", "json");
+    fetch(url, {headers: {"Accept": "application/json"}})
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        })
+        .then(function (data) {
+            link.insertAdjacentHTML("beforebegin", data.html);
+            link.remove();
+        })
+        .catch(function () {
+            window.location.href = link.href;
+        });
+});
@@ -0,0 +1,65 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import redirect
+
+from blog.cache import get_author_stats
+from blog.mixins import AsyncLoginRequiredMixin
+from blog.models import Post
+from utils.concurrency import aget_user, in_own_connection
+
+from . import views
+from .models import Profile
+
+
+class ProfileView(views.ProfileView):
+    """
+    Асинхронный вариант :view:`user_profile.views.ProfileView`.
+
+    Профиль, страница постов автора, подписчики и подписки выбираются
+    параллельно, статистика автора — после профиля, обычно из кеша.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        await aget_user(request)
+        slug = self.kwargs["slug"]
+        profiles = Profile.objects.select_related("user").order_by("-id")
+        posts = Post.objects.for_list().filter(author__profile__slug=slug)
+        try:
+            self.object, (paginator, page, posts, is_paginated), followers, following = await asyncio.gather(
+                self.get_queryset().aget(slug=slug),
+                in_own_connection(self.paginate_queryset)(posts, self.paginate_by),
+                in_own_connection(list)(profiles.filter(followed_by__slug=slug)[: self.follow_preview_size]),
+                in_own_connection(list)(profiles.filter(follows__slug=slug)[: self.follow_preview_size]),
+            )
+        except Profile.DoesNotExist:
+            raise Http404("Профиль не найден.")
+        author_stats = await in_own_connection(get_author_stats)(self.object.user_id)
+        context = await sync_to_async(self.get_context_data)(
+            object=self.object,
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=is_paginated,
+            all_posts_user=posts,
+            author_stats=author_stats,
+        )
+        context.update(followers=followers, following=following)
+        return self.render_to_response(context)
+
+
+class FollowingProfileCreateView(AsyncLoginRequiredMixin, views.FollowingProfileCreateView):
+    """
+    Асинхронный вариант :view:`user_profile.views.FollowingProfileCreateView`.
+
+    Переключение подписки выполняется в транзакции, поэтому в потоке.
+    """
+
+    async def post(self, request, **kwargs):
+        try:
+            profile = await self.model.objects.aget(slug=self.kwargs["slug"])
+        except self.model.DoesNotExist:
+            raise Http404("Профиль не найден.")
+        follower = await self.model.objects.aget(user_id=request.user.pk)
+        await sync_to_async(profile.toggle_follower)(follower)
+        return redirect(profile)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_profile", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="profile_image_widths",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 03:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_follow_amounts(apps, schema_editor):
+    Profile = apps.get_model("user_profile", "Profile")
+    through = Profile.follows.through.objects
+
+    def amount(column):
+        rows = through.filter(**{column: OuterRef("pk")}).values(column).annotate(amount=Count("pk"))
+        return Coalesce(Subquery(rows.values("amount")), 0)
+
+    Profile.objects.update(
+        followers_amount=amount("from_profile_id"),
+        following_amount=amount("to_profile_id"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_profile", "0002_profile_image_widths"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="followers_amount",
+            field=models.PositiveIntegerField(default=0, verbose_name="Колличество подписчиков"),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="following_amount",
+            field=models.PositiveIntegerField(default=0, verbose_name="Колличество подписок"),
+        ),
+        migrations.RunPython(fill_follow_amounts, migrations.RunPython.noop),
+    ]
@@ -3,18 +3,70 @@ from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.templatetags.static import static
 from django.urls import reverse
 
-from utils.utils import unique_slugify
+from utils.thumbnails import derivative_srcset, derivative_url, schedule_thumbnails
+from utils.utils import LoadedValuesMixin, UpdatedAtQuerySetMixin, save_with_unique_slug
 
+# Отправляется из :meth:`Profile.toggle_follower` с аргументами `follower` и `followed`:
+# для автоматической таблицы follows Django не отправляет post_save и post_delete.
+follow_toggled = Signal()
 
-class Profile(models.Model):
+
+class ProfileQuerySet(UpdatedAtQuerySetMixin, models.QuerySet):
+    """Набор запросов для :model:`user_profile.Profile`."""
+
+    def with_followed_by(self, user):
+        """
+        Добавляет к профилям признак `is_followed_by_me` —
+        подписан ли пользователь `user` на профиль.
+        """
+        if not user.is_authenticated:
+            return self.annotate(is_followed_by_me=Value(False))
+        follows = self.model.follows.through.objects.filter(
+            from_profile_id=OuterRef("pk"), to_profile__user_id=user.pk
+        )
+        return self.annotate(is_followed_by_me=Exists(follows))
+
+    def recount_follows(self):
+        """
+        Сверяет счётчики подписчиков и подписок с таблицей follows.
+
+        Returns:
+            Колличество обновлённых профилей.
+        """
+        through = self.model.follows.through
+
+        def amount(field_name):
+            return Coalesce(
+                Subquery(
+                    through.objects.filter(**{field_name: OuterRef("pk")})
+                    .values(field_name)
+                    .annotate(amount=Count("pk"))
+                    .values("amount")
+                ),
+                0,
+            )
+
+        return self.update(followers_amount=amount("from_profile_id"), following_amount=amount("to_profile_id"))
+
+
+class Profile(LoadedValuesMixin, models.Model):
     """
     Хранит записи профилей,
     связанную с :model:`auth.User`.
     """
 
+    # Квадратные аватары: навигация (32px), страница профиля (150px) и их версии для плотных экранов.
+    IMAGE_WIDTHS = (32, 64, 150, 300)
+    # Ширина аватара по умолчанию.
+    IMAGE_DEFAULT_WIDTH = 64
+
     user = models.OneToOneField(User, verbose_name="Профиль пользователя", on_delete=models.CASCADE)
     follows = models.ManyToManyField(
         "self", verbose_name="Подписки", related_name="followed_by", symmetrical=False, blank=True
@@ -28,16 +80,66 @@ class Profile(models.Model):
         upload_to="user_profile/media/user_image",
         validators=[FileExtensionValidator(allowed_extensions=["png", "jpg", "webp", "jpeg"])],
     )
+    profile_image_widths = models.JSONField(default=list, blank=True, editable=False)
+    followers_amount = models.PositiveIntegerField(verbose_name="Колличество подписчиков", default=0)
+    following_amount = models.PositiveIntegerField(verbose_name="Колличество подписок", default=0)
+    updated_at = models.DateTimeField(verbose_name="Дата изменения", auto_now=True)
+
+    objects = ProfileQuerySet.as_manager()
 
     def __str__(self):
         """Возвращает строку в виде имени пользователя."""
         return self.user.username
 
     def save(self, *args, **kwargs):
-        """Создание поля slug при его отсутствии."""
-        if not self.slug:
-            self.slug = unique_slugify(self, self.user.username)
-        super().save(*args, **kwargs)
+        """
+        Создание поля slug при его отсутствии
+        и создание миниатюр при смене изображения.
+        """
+        image_changed = self.has_changed("profile_image")
+        if image_changed:
+            self.profile_image_widths = []
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, self.user.username, super().save, *args, **kwargs)
+        if image_changed and self.profile_image:
+            schedule_thumbnails(self, "profile_image", "profile_image_widths", self.IMAGE_WIDTHS, square=True)
+        self.remember_loaded_values()
+
+    def toggle_follower(self, follower):
+        """
+        Подписывает профиль `follower` на этот профиль или отменяет подписку.
+
+        Счётчики обоих профилей меняются атомарными UPDATE
+        в той же транзакции, что и запись в таблице follows.
+
+        Returns:
+            bool: True, если подписка оформлена.
+        """
+        if follower.pk == self.pk:
+            return False
+        through = self.follows.through
+        with transaction.atomic():
+            deleted, _ = through.objects.filter(from_profile_id=self.pk, to_profile_id=follower.pk).delete()
+            if deleted:
+                delta = -1
+            else:
+                try:
+                    with transaction.atomic():
+                        through.objects.create(from_profile_id=self.pk, to_profile_id=follower.pk)
+                except IntegrityError:
+                    # Параллельный запрос уже оформил эту подписку и учёл её в счётчиках.
+                    return True
+                delta = 1
+            # Порядок по pk исключает взаимную блокировку при встречных подписках.
+            updates = sorted([(self.pk, "followers_amount"), (follower.pk, "following_amount")])
+            for pk, field_name in updates:
+                Profile.objects.filter(pk=pk).update(**{field_name: F(field_name) + delta})
+            follow_toggled.send(sender=Profile, instance=self, follower=follower, followed=delta > 0)
+        self.followers_amount += delta
+        follower.following_amount += delta
+        return delta > 0
 
     def get_absolute_url(self):
         """Возвращает ссылку на профиль, по идентификатору slug."""
@@ -47,9 +149,19 @@ class Profile(models.Model):
     def get_profile_image(self):
         """Получение заглушки при отсутсвии изображения."""
         if not self.profile_image:
-            return "/static/img/default-avatar.png"
+            return static("img/default-avatar.png")
+        if self.profile_image_widths:
+            width = max((w for w in self.profile_image_widths if w <= self.IMAGE_DEFAULT_WIDTH), default=None)
+            return derivative_url(self.profile_image, width or min(self.profile_image_widths))
         return self.profile_image.url
 
+    @property
+    def get_profile_image_srcset(self):
+        """Значение `srcset` из миниатюр WebP или пустая строка."""
+        if not self.profile_image or not self.profile_image_widths:
+            return ""
+        return derivative_srcset(self.profile_image, self.profile_image_widths)
+
     @property
     def get_age(self):
         """Возвращает возраст пользователя."""
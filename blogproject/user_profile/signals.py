@@ -1,5 +1,5 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
 
 from .models import Profile
@@ -7,8 +7,32 @@ from .models import Profile
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
-    """Создание профиля пользователя :model:`user_profile.Profile`."""
+    """
+    Создание профиля пользователя :model:`user_profile.Profile`.
 
+    Профиль создаётся сразу, а не фоновой задачей:
+    страницы пользователя обращаются к нему в том же запросе.
+    """
     if created:
         Profile.objects.create(user=instance)
-        instance.profile.save()
+
+
+@receiver(m2m_changed, sender=Profile.follows.through)
+def profile_follows_changed(sender, instance, action, pk_set, *args, **kwargs):
+    """
+    После изменения подписок через связь many-to-many
+    (например, из админ-панели) пересчитывает счётчики
+    затронутых :model:`user_profile.Profile`.
+    """
+    if action == "pre_clear":
+        instance._cleared_profile_ids = list(
+            instance.follows.values_list("pk", flat=True).union(instance.followed_by.values_list("pk", flat=True))
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action == "post_clear":
+        profile_ids = instance.__dict__.pop("_cleared_profile_ids", [])
+    else:
+        profile_ids = list(pk_set)
+    Profile.objects.filter(pk__in=[instance.pk, *profile_ids]).recount_follows()
@@ -1,12 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+# Представления чтения и переключатели в async-варианте для ASGI.
+read_views = async_views if settings.ASYNC_READ_VIEWS else views
 
 app_name = "profile"
 
 urlpatterns = [
-    path("profile_detail/<str:slug>/", views.ProfileView.as_view(), name="profile_detail"),
-    path("profile_detail/<str:slug>/follow/", views.FollowingProfileCreateView.as_view(), name="follow_user"),
+    path("profile_detail/<str:slug>/", read_views.ProfileView.as_view(), name="profile_detail"),
+    path("profile_detail/<str:slug>/follow/", read_views.FollowingProfileCreateView.as_view(), name="follow_user"),
+    path(
+        "profile_detail/<str:slug>/followers/",
+        views.FollowListView.as_view(relation="followers"),
+        name="profile_followers",
+    ),
+    path(
+        "profile_detail/<str:slug>/following/",
+        views.FollowListView.as_view(relation="following"),
+        name="profile_following",
+    ),
     path("update_profile/", views.ProfileEditView.as_view(), name="update_profile"),
     path("register/", views.RegisterCreateView.as_view(), name="register"),
     path("login/", views.UserLoginView.as_view(), name="login"),
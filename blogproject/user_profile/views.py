@@ -1,27 +1,39 @@
 from django.contrib import messages
 from django.contrib.auth import logout
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView, PasswordChangeView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.db import transaction
-from django.shortcuts import redirect
+from django.db.models import Max
+from django.db.models.functions import Greatest
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DetailView, UpdateView, View
+from django.views.generic import CreateView, DetailView, ListView, UpdateView, View
 
+from blog.cache import get_author_stats
+from blog.mixins import ConditionalGetMixin, CursorPaginationMixin, ReadReplicaMixin
 from blog.models import Post
 
 from .forms import PasswordChangingForm, ProfileUpdateForm, UserLoginForm, UserRegisterForm, UserUpdateForm
 from .models import Profile
 
 
-class ProfileView(DetailView):
+class ProfileView(ReadReplicaMixin, ConditionalGetMixin, CursorPaginationMixin, DetailView):
     """
-    Отображение отдельного объекта :model:`user_profile.Profile`.
+    Отображение отдельного объекта :model:`user_profile.Profile`
+    с курсорным постраничным выводом постов автора.
 
     **Context Object Name**
 
     ``profile``
         Экземпляр :model:`user_profile.Profile`.
 
+    ``all_posts_user``
+        Страница экземпляров :model:`blog.Post` автора.
+
+    ``author_stats``
+        Колличество постов автора, likes и комментариев к ним.
+
     **Template:**
 
     :template:`user_profile/profile_detail.html`
@@ -30,21 +42,112 @@ class ProfileView(DetailView):
     model = Profile
     context_object_name = "profile"
     template_name = "user_profile/profile_detail.html"
+    # Сколько подписчиков и подписок показывается на странице профиля.
+    follow_preview_size = 10
+    conditional_tags = ()
+    paginate_by = 10
+    # Нумерация страниц потребовала бы COUNT(*) по всем постам автора.
+    pagination_mode = "cursor"
+
+    def get_queryset(self):
+        """Вернуть профиль вместе с признаком подписки текущего пользователя."""
+        return Profile.objects.select_related("user").with_followed_by(self.request.user)
+
+    def get_last_modified(self):
+        """
+        Дата изменения профиля (подписки меняют счётчики) или его постов.
+
+        Удаление поста дату не меняет, его учитывает тег автора
+        (см. :meth:`get_conditional_tags`).
+        """
+        row = (
+            Profile.objects.filter(slug=self.kwargs["slug"])
+            .values("user_id")
+            .annotate(last_modified=Greatest(Max("updated_at"), Max("user__author_post__updated_at")))
+            .order_by("user_id")
+            .first()
+        )
+        if row is None:
+            return None
+        self.author_id = row["user_id"]
+        return row["last_modified"]
+
+    def get_conditional_tags(self):
+        """Тег автора сбрасывается при сохранении и удалении его постов."""
+        return [*super().get_conditional_tags(), f"author:{self.author_id}"]
+
+    def get_author_posts(self):
+        """Посты автора профиля; страница выбирается по индексу blog_post_author_date_idx."""
+        return Post.objects.for_list().filter(author_id=self.object.user_id)
 
     def get_context_data(self, **kwargs):
-        """Получить контекст для этого представления."""
+        """
+        Получить контекст для этого представления.
+
+        Страница постов и статистика автора, уже выбранные
+        async-вариантом представления, передаются в `kwargs`.
+        """
         context = super().get_context_data(**kwargs)
         context["title"] = f"Страница пользователя: {self.object.user.username}"
-        context["all_posts_user"] = Post.objects.filter(author=self.object.user)
+        if "page_obj" not in context:
+            paginator, page, posts, is_paginated = self.paginate_queryset(self.get_author_posts(), self.paginate_by)
+            context.update(paginator=paginator, page_obj=page, is_paginated=is_paginated, all_posts_user=posts)
+        if "author_stats" not in context:
+            context["author_stats"] = get_author_stats(self.object.user_id)
+        profiles = Profile.objects.select_related("user").order_by("-id")
+        context["followers"] = profiles.filter(followed_by=self.object)[: self.follow_preview_size]
+        context["following"] = profiles.filter(follows=self.object)[: self.follow_preview_size]
         return context
 
 
-class FollowingProfileCreateView(View):
+class FollowListView(ReadReplicaMixin, CursorPaginationMixin, ListView):
+    """
+    Отображение подписчиков или подписок объекта :model:`user_profile.Profile`
+    с курсорным постраничным выводом.
+
+    **Context Object Name**
+
+    ``profiles``
+        Экземпляры :model:`user_profile.Profile`.
+
+    **Template:**
+
+    :template:`user_profile/follow_list.html`
+    """
+
+    template_name = "user_profile/follow_list.html"
+    context_object_name = "profiles"
+    paginate_by = 30
+    cursor_ordering = ("-id",)
+    # "followers" — подписчики профиля, "following" — его подписки.
+    relation = "followers"
+
+    def get_queryset(self):
+        """Вернуть подписчиков или подписки профиля по идентификатору `slug`."""
+        self.profile = get_object_or_404(Profile.objects.select_related("user"), slug=self.kwargs["slug"])
+        lookup = "followed_by" if self.relation == "followers" else "follows"
+        return (
+            Profile.objects.filter(**{lookup: self.profile}).select_related("user").with_followed_by(self.request.user)
+        )
+
+    def get_context_data(self, **kwargs):
+        """Получить контекст для этого представления."""
+        context = super().get_context_data(**kwargs)
+        context["profile"] = self.profile
+        if self.relation == "followers":
+            context["title"] = f"Подписчики пользователя: {self.profile.user.username}"
+        else:
+            context["title"] = f"Подписки пользователя: {self.profile.user.username}"
+        return context
+
+
+class FollowingProfileCreateView(LoginRequiredMixin, View):
     """
     Создание объекта follows :model:`user_profile.Profile`.
     """
 
     model = Profile
+    login_url = "profile:login"
 
     def post(self, request, **kwargs):
         """
@@ -54,13 +157,8 @@ class FollowingProfileCreateView(View):
         Returns:
             redirect: URL адрес объекта :model:`user_profile.Profile`
         """
-        if request.user.is_authenticated:
-            profile = self.model.objects.get(slug=self.kwargs["slug"])
-            curent_user_profile = request.user.profile
-            if curent_user_profile in profile.follows.all():
-                profile.follows.remove(curent_user_profile)
-            else:
-                profile.follows.add(curent_user_profile)
+        profile = get_object_or_404(self.model, slug=self.kwargs["slug"])
+        profile.toggle_follower(request.user.profile)
         return redirect(profile)
 
 
@@ -0,0 +1,34 @@
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def in_own_connection(func):
+    """
+    Оборачивает синхронную функцию с запросами к базе данных в корутину,
+    которая выполняется в отдельном потоке со своим соединением.
+
+    Async-методы ORM выполняются по очереди в общем потоке запроса,
+    а такие корутины можно выполнять параллельно с ними через `asyncio.gather`.
+    """
+
+    def call(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(call, thread_sensitive=False)
+
+
+async def aget_user(request):
+    """
+    Загружает пользователя запроса (сессию и :model:`auth.User`)
+    вне цикла событий и возвращает его.
+    """
+
+    def load():
+        # Обращение к атрибуту загружает ленивый объект пользователя.
+        request.user.is_authenticated
+        return request.user
+
+    return await sync_to_async(load)()
@@ -0,0 +1,182 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Cookie, закрепляющая чтение пользователя за основной базой после записи.
+PIN_COOKIE = "db_primary"
+PIN_SALT = "utils.db_router.pin"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Приложения, которые всегда читаются из основной базы:
+# сессия, созданная при входе, может ещё не дойти до реплики.
+PRIMARY_APPS = {"sessions"}
+
+
+class RoutingState:
+    """Состояние маршрутизации запросов к базе данных в рамках одного ответа."""
+
+    def __init__(self, pinned):
+        # Чтение закреплено за основной базой: запрос на запись или недавняя запись пользователя.
+        self.pinned = pinned
+        # Представление или шаблонный тег разрешили чтение с реплики.
+        self.replica = False
+        # В ходе ответа была запись в основную базу.
+        self.wrote = False
+
+    @property
+    def use_replica(self):
+        return self.replica and not (self.pinned or self.wrote)
+
+
+routing_state = ContextVar("routing_state", default=None)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Разрешает чтение с реплики внутри блока `with`,
+    если ответ не закреплён за основной базой.
+
+    Вне обработки запроса (команды, фоновые задачи) ничего не меняет.
+    """
+    state = routing_state.get()
+    if state is None:
+        yield
+        return
+    replica, state.replica = state.replica, True
+    try:
+        yield
+    finally:
+        state.replica = replica
+
+
+class WeightedRoundRobin:
+    """
+    Плавный взвешенный круговой выбор (как в nginx):
+    реплика с весом 2 выбирается вдвое чаще реплики с весом 1,
+    и выборы одной реплики не идут подряд без необходимости.
+    """
+
+    def __init__(self, weights):
+        self.weights = {alias: weight for alias, weight in weights.items() if weight > 0}
+        self.total = sum(self.weights.values())
+        self.current = dict.fromkeys(self.weights, 0)
+        self.lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.weights)
+
+    def choose(self):
+        with self.lock:
+            for alias, weight in self.weights.items():
+                self.current[alias] += weight
+            alias = max(self.current, key=self.current.get)
+            self.current[alias] -= self.total
+            return alias
+
+
+class PrimaryReplicaRouter:
+    """
+    Направляет чтение разрешённых представлений на реплики из ``DATABASE_REPLICAS``,
+    а запись и всё остальное чтение — в основную базу ``default``.
+
+    Чтение с реплики разрешает :class:`ReplicaRoutingMiddleware`
+    для представлений с атрибутом ``use_read_replica``
+    и :func:`read_from_replica` для отдельных блоков кода.
+    """
+
+    def __init__(self):
+        self.replicas = WeightedRoundRobin(settings.DATABASE_REPLICA_WEIGHTS)
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or not state.use_replica or not self.replicas:
+            return None
+        if model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return self.replicas.choose()
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Реплики содержат те же данные, что и основная база."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Миграции применяются только к основной базе, реплики получают их репликацией."""
+        if db in settings.DATABASE_REPLICA_WEIGHTS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Включает чтение с реплик для представлений с ``use_read_replica = True``.
+
+    После записи в основную базу пользователь получает подписанную cookie,
+    и его чтение ``REPLICA_PIN_SECONDS`` секунд идёт из основной базы,
+    чтобы он сразу видел свои изменения несмотря на отставание реплик.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        pinned = request.method not in SAFE_METHODS or self.is_pinned(request)
+        state = RoutingState(pinned)
+        return state, routing_state.set(state)
+
+    def is_pinned(self, request):
+        """Была ли у пользователя запись за последние ``REPLICA_PIN_SECONDS`` секунд."""
+        value = request.get_signed_cookie(
+            PIN_COOKIE, default=None, salt=PIN_SALT, max_age=settings.REPLICA_PIN_SECONDS
+        )
+        return value is not None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", view_func)
+        routing_state.get().replica = getattr(view_class, "use_read_replica", False)
+
+    def finish(self, state, response):
+        if state.wrote:
+            response.set_signed_cookie(
+                PIN_COOKIE,
+                "1",
+                salt=PIN_SALT,
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
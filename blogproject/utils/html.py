@@ -0,0 +1,270 @@
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+from pathlib import PurePosixPath
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from PIL import Image
+
+# Разрешённые теги и их атрибуты; остальные теги удаляются, а их текст сохраняется.
+ALLOWED_TAGS = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "b": set(),
+    "blockquote": set(),
+    "br": set(),
+    "caption": set(),
+    "code": set(),
+    "div": set(),
+    "em": set(),
+    "figcaption": set(),
+    "figure": set(),
+    "h1": set(),
+    "h2": set(),
+    "h3": set(),
+    "h4": set(),
+    "h5": set(),
+    "h6": set(),
+    "hr": set(),
+    "i": set(),
+    "img": {"src", "alt", "title", "width", "height"},
+    "li": set(),
+    "ol": set(),
+    "p": set(),
+    "pre": set(),
+    "s": set(),
+    "span": set(),
+    "strong": set(),
+    "sub": set(),
+    "sup": set(),
+    "table": set(),
+    "tbody": set(),
+    "td": {"colspan", "rowspan"},
+    "tfoot": set(),
+    "th": {"colspan", "rowspan", "scope"},
+    "thead": set(),
+    "tr": set(),
+    "u": set(),
+    "ul": set(),
+}
+
+# Теги, содержимое которых удаляется целиком.
+DROPPED_TAGS = {"script", "style", "iframe", "object", "embed", "noscript", "template", "textarea", "select"}
+
+VOID_TAGS = {"br", "hr", "img"}
+
+# Теги, отделяющие текст отрывка пробелом.
+BLOCK_TAGS = {"blockquote", "br", "div", "figcaption", "hr", "li", "p", "pre", "td", "th", "tr"} | {
+    f"h{level}" for level in range(1, 7)
+}
+
+# Свойства CSS, которые CKEditor использует для выравнивания и размеров.
+ALLOWED_STYLES = {"text-align", "float", "width", "height"}
+
+SAFE_STYLE_VALUE_RE = re.compile(r"^[\w\s.%#-]+$")
+
+SAFE_URL_SCHEMES = {"", "http", "https", "mailto"}
+
+# Средняя скорость чтения, слов в минуту.
+WORDS_PER_MINUTE = 200
+
+EXCERPT_LENGTH = 300
+
+
+def _safe_url(value):
+    value = value.strip()
+    try:
+        scheme = urlsplit(value).scheme.lower()
+    except ValueError:
+        return None
+    return value if scheme in SAFE_URL_SCHEMES else None
+
+
+def _clean_style(value):
+    """Оставляет в атрибуте `style` только разрешённые свойства с безопасными значениями."""
+    declarations = {}
+    for declaration in value.split(";"):
+        name, _, prop_value = declaration.partition(":")
+        name, prop_value = name.strip().lower(), prop_value.strip()
+        if name in ALLOWED_STYLES and SAFE_STYLE_VALUE_RE.match(prop_value):
+            declarations[name] = prop_value
+    return declarations
+
+
+def _pixels(value):
+    match = re.fullmatch(r"\s*(\d+)(px)?\s*", value or "")
+    return int(match.group(1)) if match else None
+
+
+def local_image_size(src):
+    """
+    Размеры изображения из хранилища медиафайлов по его ссылке.
+
+    Returns:
+        Ширина и высота или None для внешних и недоступных изображений.
+    """
+    parts = urlsplit(src)
+    media_url = settings.MEDIA_URL or ""
+    if parts.scheme or parts.netloc or not parts.path.startswith(media_url):
+        return None
+    name = parts.path.removeprefix(media_url).lstrip("/")
+    # Относительные ссылки с «..» указывают за пределы хранилища.
+    if not name or ".." in PurePosixPath(name).parts:
+        return None
+    try:
+        with default_storage.open(name) as file, Image.open(file) as image:
+            return image.size
+    except (OSError, ValueError, SuspiciousFileOperation):
+        return None
+
+
+class BodySanitizer(HTMLParser):
+    """
+    Очищает HTML текста поста по белому списку тегов и атрибутов
+    и одновременно собирает его текст для отрывка и времени чтения.
+
+    Незакрытые теги закрываются, лишние закрывающие теги отбрасываются.
+    Изображения получают `loading="lazy"` и размеры `width`/`height`
+    из стиля редактора или из самого файла.
+    """
+
+    def __init__(self, image_size=local_image_size):
+        super().__init__(convert_charrefs=True)
+        self.image_size = image_size
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.dropped = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropped += 1
+            return
+        if self.dropped or tag not in ALLOWED_TAGS:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+        attributes = self.clean_attributes(tag, attrs)
+        if attributes is None:
+            return
+        rendered = "".join(f' {name}="{escape(str(value))}"' for name, value in attributes.items())
+        self.html.append(f"<{tag}{rendered}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropped = max(self.dropped - 1, 0)
+            return
+        if self.dropped or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            current = self.open_tags.pop()
+            self.html.append(f"</{current}>")
+            if current == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+
+    def handle_data(self, data):
+        if self.dropped:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def clean_attributes(self, tag, attrs):
+        """
+        Разрешённые атрибуты тега.
+
+        Returns:
+            Словарь атрибутов или None, если тег нужно пропустить
+            (например, изображение без безопасного `src`).
+        """
+        allowed = ALLOWED_TAGS[tag]
+        attributes = {}
+        style = {}
+        for name, value in attrs:
+            if value is None:
+                continue
+            if name == "style":
+                style = _clean_style(value)
+            elif name in allowed:
+                if name in ("href", "src"):
+                    value = _safe_url(value)
+                    if value is None:
+                        continue
+                attributes[name] = value
+        if tag == "a" and "href" in attributes:
+            attributes["rel"] = "nofollow noopener"
+        if tag == "img":
+            if "src" not in attributes:
+                return None
+            self.add_image_hints(attributes, style)
+        if tag == "img":
+            # Размеры в пикселях перенесены в атрибуты width и height.
+            style = {name: value for name, value in style.items() if not _pixels(value)}
+        if style:
+            attributes["style"] = "; ".join(f"{name}: {value}" for name, value in style.items())
+        return attributes
+
+    def add_image_hints(self, attributes, style):
+        """Размеры и отложенная загрузка изображения, чтобы страница не прыгала при загрузке."""
+        width = _pixels(attributes.get("width")) or _pixels(style.get("width"))
+        height = _pixels(attributes.get("height")) or _pixels(style.get("height"))
+        if not (width and height):
+            size = self.image_size(attributes["src"])
+            if size and size[0] and size[1]:
+                if width:
+                    height = round(size[1] * width / size[0])
+                elif height:
+                    width = round(size[0] * height / size[1])
+                else:
+                    width, height = size
+        attributes.pop("width", None)
+        attributes.pop("height", None)
+        # Если второй размер вычислить не удалось, известный всё равно сохраняется.
+        if width:
+            attributes["width"] = width
+        if height:
+            attributes["height"] = height
+        attributes["loading"] = "lazy"
+        attributes["decoding"] = "async"
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.html.append(f"</{self.open_tags.pop()}>")
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Отрывок текста не длиннее `length` символов, обрезанный по границе слова."""
+    if len(text) <= length:
+        return text
+    cut = text[: length - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:-—") + "…"
+
+
+def render_body(body, image_size=local_image_size):
+    """
+    Очищенный HTML текста поста, отрывок и время чтения.
+
+    Returns:
+        Кортеж (HTML, отрывок, время чтения в минутах).
+    """
+    sanitizer = BodySanitizer(image_size)
+    sanitizer.feed(body or "")
+    sanitizer.close()
+    text = " ".join("".join(sanitizer.text).split())
+    words = len(text.split())
+    return "".join(sanitizer.html), make_excerpt(text), max(1, math.ceil(words / WORDS_PER_MINUTE))
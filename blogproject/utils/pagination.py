@@ -0,0 +1,202 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    """Курсор страницы повреждён или не подходит к сортировке."""
+
+
+def estimate_count(model, using="default"):
+    """
+    Оценка колличества строк таблицы модели
+    по статистике PostgreSQL (`pg_class.reltuples`).
+
+    Returns:
+        Оценка колличества строк или None, если статистика недоступна.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Нумерованный постраничный вывод без COUNT(*) по большим таблицам.
+
+    Колличество записей можно передать явно через `count`,
+    иначе для запросов без фильтров оно берётся из статистики PostgreSQL.
+    """
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        """Колличество записей: явное, оценочное или точное."""
+        if self._count is not None:
+            return self._count
+        if isinstance(self.object_list, QuerySet) and not self.object_list.query.where:
+            estimate = estimate_count(self.object_list.model, using=self.object_list.db)
+            if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CursorPage:
+    """Страница курсорного постраничного вывода."""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Курсорный (keyset) постраничный вывод.
+
+    Вместо OFFSET страница выбирается условием по полям сортировки
+    `ordering` относительно последней записи предыдущей страницы,
+    поэтому глубокие страницы не дороже первой и COUNT(*) не нужен.
+    Последнее поле сортировки должно быть уникальным (обычно `id`).
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=("-post_date", "-id")):
+        directions = {field.startswith("-") for field in ordering}
+        if len(directions) != 1:
+            raise ImproperlyConfigured("CursorPaginator требует одинаковое направление сортировки всех полей.")
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = directions.pop()
+        self.fields = [field.lstrip("-") for field in ordering]
+
+    def _model_field(self, name):
+        opts = self.object_list.model._meta
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    def encode_cursor(self, obj, direction):
+        """Кодирует позицию записи `obj` в непрозрачный токен."""
+        values = []
+        for name in self.fields:
+            value = getattr(obj, self._model_field(name).attname)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        payload = json.dumps([direction, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """
+        Декодирует токен курсора.
+
+        Returns:
+            Направление ("next" или "prev") и значения полей сортировки.
+        """
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, values = json.loads(payload)
+            if direction not in ("next", "prev") or not isinstance(values, list) or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            # null, списки и словари to_python пропускает, а в условии по полям сортировки они дают 500.
+            if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in values):
+                raise InvalidCursor(cursor)
+            values = [self._model_field(name).to_python(value) for name, value in zip(self.fields, values)]
+        except (binascii.Error, TypeError, ValueError, ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+        return direction, values
+
+    def _seek_filter(self, values, forward, fields=None):
+        """Условие «после позиции `values`» в выбранном направлении обхода."""
+        fields = fields or self.fields
+        lookup = "lt" if self.descending == forward else "gt"
+        condition = Q()
+        for index, name in enumerate(fields):
+            step = Q(**{f"{name}__{lookup}": values[index]})
+            for prev_name, prev_value in zip(fields[:index], values[:index]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        # Ограничение по первому полю позволяет использовать индекс как диапазон.
+        return Q(**{f"{fields[0]}__{lookup}e": values[0]}) & condition
+
+    def _ordering(self, forward, fields=None):
+        """Сортировка по полям `fields` в выбранном направлении обхода."""
+        fields = fields or self.fields
+        if self.descending == forward:
+            return [f"-{name}" for name in fields]
+        return list(fields)
+
+    def _seek(self, values, forward):
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, forward))
+        return queryset.order_by(*self._ordering(forward))
+
+    def fetch(self, values, forward, limit):
+        """Выбирает не больше `limit` записей после позиции `values`."""
+        return list(self._seek(values, forward)[:limit])
+
+    async def afetch(self, values, forward, limit):
+        """Асинхронный вариант :meth:`fetch`."""
+        return [obj async for obj in self._seek(values, forward)[:limit]]
+
+    def _make_page(self, rows, values, forward):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        next_cursor = self.encode_cursor(rows[-1], "next") if rows and has_next else None
+        previous_cursor = self.encode_cursor(rows[0], "prev") if rows and has_previous else None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        """Возвращает страницу, начинающуюся после позиции `cursor`."""
+        direction, values = self.decode_cursor(cursor) if cursor else ("next", None)
+        forward = direction == "next"
+        return self._make_page(self.fetch(values, forward, self.per_page + 1), values, forward)
+
+    async def apage(self, cursor=None):
+        """Асинхронный вариант :meth:`page` на async-интерфейсе ORM."""
+        direction, values = self.decode_cursor(cursor) if cursor else ("next", None)
+        forward = direction == "next"
+        return self._make_page(await self.afetch(values, forward, self.per_page + 1), values, forward)
@@ -0,0 +1,162 @@
+"""
+PostgreSQL с пулом соединений psycopg_pool.
+
+Подключается через ``ENGINE = "utils.pooled_postgresql"``, параметры пула
+задаются в ``OPTIONS["pool"]``:
+
+``min_size``, ``max_size``
+    Наименьшее и наибольшее колличество соединений пула.
+``timeout``
+    Сколько секунд ждать свободного соединения, затем OperationalError.
+``max_waiting``
+    Сколько запросов может ждать соединения одновременно (0 — без ограничения).
+``max_idle``, ``max_lifetime``
+    Через сколько секунд закрываются простаивающие и старые соединения.
+``check_after``
+    Соединение, простоявшее в пуле дольше стольких секунд,
+    проверяется при выдаче запросом ``SELECT 1``.
+
+Django закрывает соединение в конце каждого запроса (``CONN_MAX_AGE = 0``),
+а этот backend вместо закрытия возвращает его в пул.
+"""
+
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+from psycopg import OperationalError
+from psycopg.pq import ExecStatus
+from psycopg_pool import ConnectionPool
+
+# Пулы процесса по псевдонимам баз данных: обёртки соединений Django
+# создаются в каждом потоке, а пул у псевдонима один.
+_pools = {}
+_pools_lock = threading.Lock()
+
+POOL_DEFAULTS = {
+    "min_size": 2,
+    "max_size": 10,
+    "timeout": 5.0,
+    "max_waiting": 0,
+    "max_idle": 600.0,
+    "max_lifetime": 3600.0,
+}
+
+CHECK_AFTER = 30.0
+
+
+def _is_healthy(connection):
+    """Проверяет соединение запросом на уровне libpq, не открывая транзакцию psycopg."""
+    if connection.closed or connection.broken:
+        return False
+    try:
+        result = connection.pgconn.exec_(b"SELECT 1")
+    except OperationalError:
+        return False
+    return result.status == ExecStatus.TUPLES_OK
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Обёртка PostgreSQL, получающая соединения из пула psycopg_pool."""
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @property
+    def pool_options(self):
+        return {**POOL_DEFAULTS, **self.settings_dict["OPTIONS"].get("pool", {})}
+
+    @property
+    def pool(self):
+        """Пул соединений псевдонима, создаётся при первом обращении."""
+        pool = _pools.get(self.alias)
+        if pool is not None:
+            return pool
+        with _pools_lock:
+            if self.alias not in _pools:
+                if self.settings_dict["CONN_MAX_AGE"] != 0:
+                    raise ImproperlyConfigured("Пул соединений не совместим с CONN_MAX_AGE, отличным от 0.")
+                options = self.pool_options
+                options.pop("check_after", None)
+                _pools[self.alias] = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    configure=self.configure_connection,
+                    name=self.alias,
+                    **options,
+                )
+            return _pools[self.alias]
+
+    def configure_connection(self, connection):
+        """Настройка нового соединения пула, как в :meth:`get_new_connection` PostgreSQL."""
+        options = self.settings_dict["OPTIONS"]
+        if "isolation_level" in options:
+            connection.isolation_level = base.IsolationLevel(options["isolation_level"])
+        connection.cursor_factory = (
+            base.ServerBindingCursor if options.get("server_side_binding") is True else base.Cursor
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = base.IsolationLevel(
+                options.get("isolation_level", base.IsolationLevel.READ_COMMITTED)
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {options['isolation_level']} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+        return self.checkout()
+
+    def checkout(self):
+        """
+        Берёт соединение из пула. Давно простаивающие соединения
+        проверяются, а неисправные закрываются и заменяются пулом.
+        """
+        pool = self.pool
+        check_after = self.pool_options.get("check_after", CHECK_AFTER)
+        while True:
+            connection = pool.getconn()
+            returned_at = getattr(connection, "_returned_at", None)
+            if returned_at is None or time.monotonic() - returned_at < check_after or _is_healthy(connection):
+                return connection
+            connection.close()
+            pool.putconn(connection)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.connection._returned_at = time.monotonic()
+            self.pool.putconn(self.connection)
+
+    def pool_stats(self):
+        """
+        Состояние пула: занятые и свободные соединения,
+        ожидающие запросы и суммарное время ожидания.
+
+        Returns:
+            Словарь статистики или None, если пул ещё не создан.
+        """
+        pool = _pools.get(self.alias)
+        if pool is None:
+            return None
+        stats = pool.get_stats()
+        return {
+            "min_size": stats["pool_min"],
+            "max_size": stats["pool_max"],
+            "size": stats["pool_size"],
+            "available": stats["pool_available"],
+            "in_use": stats["pool_size"] - stats["pool_available"],
+            "waiting": stats.get("requests_waiting", 0),
+            "requests": stats.get("requests_num", 0),
+            "requests_queued": stats.get("requests_queued", 0),
+            "wait_ms": stats.get("requests_wait_ms", 0),
+            "timeouts": stats.get("requests_errors", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+        }
@@ -0,0 +1,197 @@
+"""
+Статические файлы для production: имена с хешем содержимого,
+сжатые копии, собранные при ``collectstatic``, и их раздача
+из самого приложения, если перед ним нет отдельного веб-сервера.
+"""
+
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Расширения уже сжатых форматов: повторное сжатие почти ничего не даёт.
+SKIP_COMPRESS_EXTENSIONS = {
+    ".br",
+    ".gz",
+    ".zip",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".avif",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".mp4",
+}
+
+# Сжатая копия сохраняется, только если она меньше оригинала хотя бы на 5%.
+MIN_COMPRESS_RATIO = 0.95
+
+# Сжатые копии файла в порядке предпочтения: Content-Encoding и суффикс имени.
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Файлы с хешем в имени никогда не меняются.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+MUTABLE_CACHE_CONTROL = "public, max-age=60"
+
+
+def compress(path):
+    """
+    Сохраняет рядом с файлом копии `.gz` и `.br` (если установлен brotli).
+
+    Returns:
+        Словарь Content-Encoding → размер сохранённой копии.
+    """
+    path = Path(path)
+    if path.suffix.lower() in SKIP_COMPRESS_EXTENSIONS:
+        return {}
+    data = path.read_bytes()
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data)
+    saved = {}
+    for encoding, suffix in ENCODINGS:
+        compressed = variants.get(encoding)
+        target = path.with_name(path.name + suffix)
+        if compressed is not None and len(compressed) < len(data) * MIN_COMPRESS_RATIO:
+            target.write_bytes(compressed)
+            saved[encoding] = len(compressed)
+        elif target.exists():
+            target.unlink()
+    return saved
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище ``collectstatic``: имена с хешем содержимого (``style.3f2a….css``)
+    и сжатые копии gzip и brotli каждого текстового файла.
+
+    Файлы, которых нет в манифесте (например, подключаемые скриптами
+    ckeditor по имени), отдаются под исходным именем, а не вызывают ошибку.
+    """
+
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Сжимаются и исходные имена: их запрашивают скрипты, строящие пути сами.
+        for name in {*paths, *self.hashed_files.values()}:
+            compress(self.path(name))
+
+
+def accepted_encodings(header):
+    """Кодировки из заголовка Accept-Encoding, не запрещённые через q=0."""
+    encodings = set()
+    for item in header.split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        if quality and quality.replace(".", "").strip("0") == "":
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+class StaticFile:
+    """Файл из ``STATIC_ROOT`` со сжатыми копиями."""
+
+    def __init__(self, name, path, immutable):
+        self.name = name
+        self.path = path
+        self.content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL
+        self.variants = {encoding: path + suffix for encoding, suffix in ENCODINGS if os.path.exists(path + suffix)}
+
+    def choose(self, request):
+        """Путь к лучшему варианту файла для клиента и его Content-Encoding."""
+        if self.variants:
+            accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+            for encoding, _ in ENCODINGS:
+                if encoding in accepted and encoding in self.variants:
+                    return self.variants[encoding], encoding
+        return self.path, None
+
+    def response(self, request):
+        path, encoding = self.choose(request)
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            response = FileResponse(open(path, "rb"), content_type=self.content_type)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Cache-Control"] = self.cache_control
+        if self.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Раздаёт собранные ``collectstatic`` файлы из ``STATIC_ROOT``
+    для развёртываний без отдельного веб-сервера.
+
+    Клиент получает копию brotli или gzip по Accept-Encoding,
+    файлы с хешем в имени кешируются навсегда (``immutable``).
+    Список файлов читается один раз при запуске процесса.
+    Включается настройкой ``STATIC_SERVE``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.files = self.scan(settings.STATIC_ROOT)
+
+    def scan(self, root):
+        """Файлы ``STATIC_ROOT`` по URL; сжатые копии доступны через свои оригиналы."""
+        hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = Path(os.path.relpath(path, root)).as_posix()
+                files[self.prefix + name] = StaticFile(name, path, name in hashed)
+        return files
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        """Ответ с файлом или None, если запрос не к статическому файлу."""
+        if request.method not in ("GET", "HEAD") or not request.path_info.startswith(self.prefix):
+            return None
+        static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return None
+        return static_file.response(request)
@@ -0,0 +1,118 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from jobs.queue import enqueue, job
+
+# Форматы производных изображений: WebP для `srcset`, JPEG как запасной `src`.
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+THUMBNAIL_QUALITY = 80
+
+
+def derivative_name(name, width, extension):
+    """Путь производного изображения рядом с оригиналом."""
+    path = PurePosixPath(name)
+    return str(path.parent / "derivatives" / f"{path.stem}-{width}w.{extension}")
+
+
+def derivative_url(field_file, width, extension="jpg"):
+    """Ссылка на производное изображение ширины `width`."""
+    return field_file.storage.url(derivative_name(field_file.name, width, extension))
+
+
+def derivative_srcset(field_file, widths, extension="webp"):
+    """Значение атрибута `srcset` для готовых производных изображений."""
+    return ", ".join(f"{derivative_url(field_file, width, extension)} {width}w" for width in widths)
+
+
+def _resize(image, width, square):
+    if square:
+        return ImageOps.fit(image, (width, width), Image.LANCZOS)
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _encode(image, image_format):
+    if image_format == "JPEG" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=THUMBNAIL_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_derivatives(name, widths, square=False, storage=default_storage):
+    """
+    Создаёт производные изображения для файла `name`
+    всех ширин `widths` в форматах WebP и JPEG.
+
+    Ширины больше оригинала заменяются шириной оригинала,
+    чтобы не увеличивать картинку.
+
+    Returns:
+        Список ширин, для которых созданы производные изображения.
+    """
+    with storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    limit = min(image.size) if square else image.width
+    generated = []
+    for width in sorted(set(widths)):
+        width = min(width, limit)
+        if width in generated:
+            break
+        resized = _resize(image, width, square)
+        for extension, image_format in THUMBNAIL_FORMATS.items():
+            target = derivative_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(_encode(resized, image_format)))
+        generated.append(width)
+    return generated
+
+
+@job
+def build_thumbnails(model_label, pk, field_name, widths_field, widths, square=False):
+    """
+    Создаёт производные изображения текущего файла объекта
+    и записывает готовые ширины в модель, если файл за это время не сменился.
+
+    Returns:
+        Список ширин, для которых созданы производные изображения.
+    """
+    model = apps.get_model(model_label)
+    name = model._default_manager.filter(pk=pk).values_list(field_name, flat=True).first()
+    if not name:
+        return []
+    generated = generate_derivatives(name, widths, square)
+    model._default_manager.filter(pk=pk, **{field_name: name}).update(**{widths_field: generated})
+    return generated
+
+
+def schedule_thumbnails(instance, field_name, widths_field, widths, square=False):
+    """
+    Ставит создание производных изображений в очередь фоновых задач,
+    чтобы не задерживать ответ.
+
+    Повторные загрузки до выполнения задачи не дублируют её:
+    задача обрабатывает файл, который будет у объекта на момент выполнения.
+    """
+    label = instance._meta.label
+    enqueue(
+        build_thumbnails,
+        label,
+        instance.pk,
+        field_name,
+        widths_field,
+        list(widths),
+        square,
+        key=f"thumbnails:{label}:{instance.pk}:{field_name}",
+    )
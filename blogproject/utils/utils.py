@@ -1,15 +1,172 @@
+import re
 from uuid import uuid4
 
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Now
 from pytils.translit import slugify
 
+# Сколько раз подбирается новый slug при конфликте уникального индекса.
+SLUG_SAVE_ATTEMPTS = 3
+
+# Место, оставляемое в поле slug под числовой суффикс вида `-123`.
+SLUG_SUFFIX_RESERVE = 10
+
+_SUFFIX_RE = re.compile(r"^(.*)-(\d+)$")
+
+
+def _slug_base(model, value, field_name="slug"):
+    """Основа slug, укороченная так, чтобы в поле поместился суффикс."""
+    max_length = model._meta.get_field(field_name).max_length
+    base = slugify(value)[: max_length - SLUG_SUFFIX_RESERVE].strip("-")
+    return base or uuid4().hex[:8]
+
+
+def _allocate_slugs(model, bases, field_name="slug", exclude_pk=None, chunk_size=200):
+    """
+    Подбирает свободный slug для каждой основы из `bases`.
+
+    Занятые варианты `основа` и `основа-N` выбираются одним запросом
+    на каждые `chunk_size` основ; совпадающие основы получают
+    последовательные суффиксы.
+    """
+    unique_bases = list(dict.fromkeys(bases))
+    taken = set()
+    for start in range(0, len(unique_bases), chunk_size):
+        end = start + chunk_size
+        chunk = unique_bases[start:end]
+        pattern = "^(%s)(-[0-9]+)?$" % "|".join(re.escape(base) for base in chunk)
+        queryset = model._default_manager.filter(**{f"{field_name}__regex": pattern})
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        taken.update(queryset.values_list(field_name, flat=True))
+
+    base_set = set(unique_bases)
+    occupied = taken & base_set
+    last_suffix = dict.fromkeys(unique_bases, 1)
+    for slug in taken:
+        match = _SUFFIX_RE.match(slug)
+        if match and match.group(1) in base_set:
+            last_suffix[match.group(1)] = max(last_suffix[match.group(1)], int(match.group(2)))
+
+    slugs = []
+    for base in bases:
+        if base not in occupied:
+            occupied.add(base)
+            slugs.append(base)
+        else:
+            last_suffix[base] += 1
+            slugs.append(f"{base}-{last_suffix[base]}")
+    return slugs
+
 
 def unique_slugify(instance, slug):
     """
     Создаёт уникальный идентификатор `slug`,
     если такой идентификатор `slug` уже существует.
+
+    Свободный вариант подбирается за один запрос к базе данных.
     """
     model = instance.__class__
-    unique_slug = slugify(slug)
-    while model.objects.filter(slug=unique_slug).exists():
-        unique_slug = f"{unique_slug}-{uuid4().hex[:8]}"
-    return unique_slug
+    return _allocate_slugs(model, [_slug_base(model, slug)], exclude_pk=instance.pk)[0]
+
+
+def bulk_unique_slugify(instances, values, field_name="slug"):
+    """
+    Назначает уникальные `slug` сразу многим новым объектам одной модели,
+    например перед `bulk_create` при импорте.
+    """
+    if not instances:
+        return
+    model = instances[0].__class__
+    bases = [_slug_base(model, value, field_name) for value in values]
+    for instance, slug in zip(instances, _allocate_slugs(model, bases, field_name)):
+        setattr(instance, field_name, slug)
+
+
+def save_with_unique_slug(instance, value, save, *args, **kwargs):
+    """
+    Сохраняет экземпляр, создавая `slug` из `value`.
+
+    Если параллельная транзакция успела занять тот же slug,
+    уникальный индекс отклонит запись, и slug будет подобран заново.
+    """
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        instance.slug = unique_slugify(instance, value)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                raise
+
+
+def iterate_pk_batches(queryset, batch_size):
+    """
+    Разбивает `queryset` на пакеты первичных ключей
+    размером `batch_size`, двигаясь по возрастанию pk.
+    """
+    last_pk = None
+    while True:
+        batch = queryset.order_by("pk")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+class LoadedValuesMixin:
+    """
+    Запоминает значения полей модели, загруженные из базы данных,
+    чтобы при сохранении понять, какие поля изменились.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def has_changed(self, *field_names):
+        """Проверяет, изменилось ли хотя бы одно из полей с момента загрузки."""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return True
+        for name in field_names:
+            attname = self._meta.get_field(name).attname
+            if attname not in loaded:
+                if attname in self.__dict__:
+                    return True
+            elif loaded[attname] != getattr(self, attname):
+                return True
+        return False
+
+    def get_loaded_value(self, field_name, default=None):
+        """Значение поля на момент загрузки из базы данных."""
+        attname = self._meta.get_field(field_name).attname
+        return getattr(self, "_loaded_values", {}).get(attname, default)
+
+    def remember_loaded_values(self):
+        """Запоминает текущие значения полей как сохранённые."""
+        self._loaded_values = {
+            field.attname: field.get_prep_value(self.__dict__[field.attname])
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+
+class UpdatedAtQuerySetMixin:
+    """
+    Набор запросов модели с полем `updated_at`: UPDATE отмечает
+    время изменения записей, как `auto_now` при сохранении экземпляра.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", Now())
+        return super().update(**kwargs)
+
+    def touch(self):
+        """Отмечает записи изменёнными, не меняя других полей."""
+        return self.update()